@@ -0,0 +1,45 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Build with: python build_exe.py  (or: python -m PyInstaller --noconfirm "Cigar Inventory.spec")
+import glob
+import os
+
+# Bundle whichever data files exist next to the spec
+spec_dir = os.path.dirname(os.path.abspath(SPEC))
+datas = [(path, '.') for path in sorted(glob.glob(os.path.join(spec_dir, 'cigar_*.json')))]
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=datas,
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='Cigar Inventory',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=['cigar.ico'],
+)
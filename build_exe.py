@@ -1,62 +1,135 @@
+import asyncio
 import os
-import shutil
 import subprocess
 import time
-import psutil
-import json
 import sys
+from importlib.metadata import PackageNotFoundError, version
+
+# Data files bundled with the app; each starts out as an empty JSON list
+_JSON_FILES = ('cigar_inventory.json', 'cigar_brands.json',
+               'cigar_sizes.json', 'cigar_types.json')
+_EMPTY_JSON = b"[]"
+
+# Resolved once; the build always runs from the directory it was started in
+PYTHON_EXE = sys.executable
+CWD = os.getcwd()
+
+SPEC_FILE = 'Cigar Inventory.spec'
 
 def check_requirements():
     """Check if all required packages are installed."""
+    # Reading the installed distribution's metadata avoids importing PyInstaller
     try:
-        import pyinstaller
-    except ImportError:
-        print("PyInstaller is not installed. Installing now...")
-        try:
-            subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
-            print("PyInstaller installed successfully!")
-        except Exception as e:
-            print(f"Failed to install PyInstaller: {e}")
-            return False
+        version('pyinstaller')
+        return True
+    except PackageNotFoundError:
+        pass
+
+    print("PyInstaller is not installed. Installing now...")
+    result = subprocess.run([PYTHON_EXE, "-m", "pip", "install", "--quiet", "pyinstaller"])
+    if result.returncode != 0:
+        print(f"Failed to install PyInstaller (pip exited with {result.returncode})")
+        return False
+    print("PyInstaller installed successfully!")
     return True
 
 def kill_running_app():
     """Kill any running instances of the application."""
-    for proc in psutil.process_iter(['pid', 'name']):
+    target = 'Cigar Inventory.exe'
+    if os.name == 'nt':
+        # Let Windows look the image up by name instead of walking every PID
+        subprocess.run(['taskkill', '/F', '/IM', target, '/T'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+
+    try:
+        import psutil
+    except ImportError:
+        print("psutil is not installed; skipping running instance check.")
+        return
+
+    for pid in psutil.pids():
         try:
-            if proc.info['name'] == 'Cigar Inventory.exe':
-                proc.kill()
-                time.sleep(1)  # Give the process time to terminate
+            proc = psutil.Process(pid)
+            with proc.oneshot():  # Cache the process info lookups
+                if proc.name() != target:
+                    continue
+            proc.kill()
+            try:
+                proc.wait(timeout=2)  # Returns as soon as the process is reaped
+            except psutil.TimeoutExpired:
+                print(f"Warning: PID {proc.pid} did not terminate")
+            break  # Single-instance app, no need to keep scanning
         except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+            continue
 
-def clean_build_files():
-    """Clean up old build files."""
-    paths_to_clean = ['build', 'dist', '__pycache__', 'Cigar Inventory.spec']
-    
-    for path in paths_to_clean:
+def _fast_rmtree(path):
+    """Remove a directory tree with the native OS deleter, falling back to shutil."""
+    if not os.path.isdir(path):
+        return
+    if os.name == 'nt':
+        subprocess.run(['cmd', '/c', 'rd', '/s', '/q', path], check=False)
+    else:
+        subprocess.run(['rm', '-rf', path], check=False)
+    if os.path.isdir(path):  # Native tool unavailable or failed
+        import shutil
+        shutil.rmtree(path)
+
+def _clean_one(path, attempts=3):
+    """Remove a single build artifact, file or directory."""
+    for attempt in range(attempts):
         try:
             if os.path.isfile(path):
                 os.remove(path)
             elif os.path.isdir(path):
-                shutil.rmtree(path)
+                _fast_rmtree(path)
+            return
+        except FileNotFoundError:
+            return
+        except PermissionError as e:
+            # Windows may still hold a handle briefly; back off and retry
+            if attempt == attempts - 1:
+                print(f"Warning: Could not remove {path}: {e}")
+            else:
+                time.sleep(0.05 * (2 ** attempt))
         except Exception as e:
             print(f"Warning: Could not remove {path}: {e}")
-            time.sleep(2)  # Give Windows time to release file handles
+            return
+
+def clean_build_files():
+    """Clean up old build files."""
+    paths_to_clean = ['build', 'dist', '__pycache__']
+    
+    # Nothing to do on a first build
+    if not any(os.path.exists(path) for path in paths_to_clean):
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # The paths are independent trees, so delete them concurrently
+    with ThreadPoolExecutor(max_workers=len(paths_to_clean)) as executor:
+        list(executor.map(_clean_one, paths_to_clean))
 
 def create_json_files():
     """Create empty JSON files if they don't exist."""
-    json_files = {
-        'cigar_inventory.json': [],
-        'cigar_brands.json': [],
-        'cigar_sizes.json': [],
-        'cigar_types.json': []
-    }
+    # One directory read instead of a stat per file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries}
     
-    for filename, default_data in json_files.items():
-        if not os.path.exists(filename):
-            with open(filename, 'w') as f:
-                json.dump(default_data, f, indent=2)
+    for filename in _JSON_FILES:
+        if filename in present:
+            continue
+        # O_EXCL still guards against the file appearing since the scan
+        try:
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            continue
+        # No fsync: these bootstrap files are regenerated on the next build,
+        # so crash-safety is not worth an extra disk flush per file.
+        try:
+            os.write(fd, _EMPTY_JSON)
+        finally:
+            os.close(fd)
 
 def build_executable():
     """Build the executable using PyInstaller."""
@@ -64,63 +137,58 @@ def build_executable():
         # Verify main.py exists
         if not os.path.exists('main.py'):
             print("Error: main.py not found in current directory!")
-            print(f"Current directory: {os.getcwd()}")
+            print(f"Current directory: {CWD}")
             print("Please make sure you're running this script from the correct directory.")
             return False
 
-        # Build command with explicit python path
-        cmd = [
-            sys.executable,
-            '-m',
-            'PyInstaller',
-            '--noconfirm',
-            '--onefile',
-            '--windowed',
-            '--icon=cigar.ico',
-            '--name=Cigar Inventory',
-            '--add-data=cigar_inventory.json;.',
-            '--add-data=cigar_brands.json;.',
-            '--add-data=cigar_sizes.json;.',
-            '--add-data=cigar_types.json;.',
-            'main.py'
-        ]
+        # Build from the committed spec so PyInstaller can reuse its analysis cache
+        cmd = [PYTHON_EXE, '-m', 'PyInstaller', '--noconfirm', SPEC_FILE]
         
-        # Execute build
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Execute build, streaming its output as it is produced
+        print("Build output:", flush=True)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        # Pass the raw bytes through rather than decoding and re-encoding them
+        out = sys.stdout.buffer
+        for line in proc.stdout:
+            out.write(line)
+            out.flush()
         
-        # Print output for debugging
-        if result.stdout:
-            print("Build output:")
-            print(result.stdout)
-        if result.stderr:
-            print("Build errors:")
-            print(result.stderr)
-            
-        return result.returncode == 0
+        return proc.wait() == 0
     except Exception as e:
         print(f"An error occurred during build: {e}")
         return False
 
+async def prepare_build(clean=True):
+    """Run the independent pre-build steps concurrently."""
+    async def stop_and_clean():
+        # The running exe locks dist/, so it must be gone before cleanup starts
+        print("Checking for running instances...")
+        await asyncio.to_thread(kill_running_app)
+        
+        # Clean up old files (PyInstaller's --noconfirm overwrites them anyway)
+        if clean:
+            print("Cleaning up old build files...")
+            await asyncio.to_thread(clean_build_files)
+        else:
+            print("Incremental build: skipping cleanup of old build files.")
+    
+    async def init_json():
+        print("Creating JSON files...")
+        await asyncio.to_thread(create_json_files)
+    
+    await asyncio.gather(stop_and_clean(), init_json())
+
 def main():
     print("Starting build process...")
-    print(f"Current working directory: {os.getcwd()}")
+    print(f"Current working directory: {CWD}")
     
     # Check requirements
     if not check_requirements():
         print("Failed to ensure requirements. Exiting.")
         return
     
-    # Kill any running instances
-    print("Checking for running instances...")
-    kill_running_app()
-    
-    # Clean up old files
-    print("Cleaning up old build files...")
-    clean_build_files()
-    
-    # Create JSON files
-    print("Creating JSON files...")
-    create_json_files()
+    # Kill running instances, clean old files and create JSON files
+    asyncio.run(prepare_build(clean='--incremental' not in sys.argv[1:]))
     
     # Build the executable
     print("Building executable...")
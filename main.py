@@ -4,7 +4,11 @@ import json
 import os
 from datetime import datetime
 import csv
-import pandas as pd
+from collections import deque
+import concurrent.futures
+import functools
+import mmap
+import operator
 import sys
 import uuid  # Add this import for generating unique transaction IDs
 
@@ -16,6 +20,253 @@ try:
 except ImportError:
     MODERN_THEME_AVAILABLE = False
 
+# Use orjson for the data files when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Stream Excel exports row by row when xlsxwriter is installed
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# Above this many rows the inventory tree only materializes the visible ones
+VIRTUAL_TREE_THRESHOLD = 1000
+
+# Column id -> (heading, width) for the trees that are built in more than one place
+SALE_TRANSACTION_COLUMNS = {
+    'date': ('Date & Time', 150),
+    'items': ('Items Sold', 80),
+    'total': ('Total Value', 100),
+}
+SALE_DETAIL_COLUMNS = {
+    'cigar': ('Cigar', 120),
+    'brand': ('Brand', 100),
+    'size': ('Size', 70),
+    'quantity': ('Qty', 50),
+    'price_per_stick': ('Price/Stick', 80),
+    'total_cost': ('Total', 80),
+}
+RESUPPLY_ORDER_COLUMNS = {
+    'date': ('Date & Time', 150),
+    'items': ('Items', 80),
+    'total_cost': ('Total Cost', 100),
+    'total_shipping': ('Shipping', 100),
+}
+RESUPPLY_DETAIL_COLUMNS = {
+    'brand': ('Brand', 100),
+    'cigar': ('Cigar', 120),
+    'size': ('Size', 70),
+    'type': ('Type', 80),
+    'quantity': ('Qty', 50),
+    'price': ('Price', 80),
+    'shipping': ('Ship+Tax', 80),
+    'total_cost': ('Total', 80),
+}
+SALE_CONFIRMATION_COLUMNS = {
+    'cigar': ('Cigar', 150),
+    'quantity': ('Qty', 50),
+    'price': ('Price/Stick', 80),
+    'total': ('Total', 80),
+}
+SALES_HISTORY_COLUMNS = {
+    'date': ('Date', 150),
+    'brand': ('Brand', 150),
+    'cigar': ('Cigar', 150),
+    'size': ('Size', 150),
+    'price_per_stick': ('Price/Stick', 150),
+}
+
+def _apply_columns(tree, spec):
+    """Set the heading text and width of each column in a column spec."""
+    for col, (heading, width) in spec.items():
+        tree.heading(col, text=heading)
+        tree.column(col, width=width)
+
+def _fill_tree(tree, rows):
+    """Replace all rows of a Treeview with these value tuples in one batch; returns the new iids."""
+    tree.delete(*tree.get_children())
+    # The scrollbar is detached while the rows go in, so it is updated once rather than per insert
+    yscrollcommand = tree.cget('yscrollcommand')
+    tree.configure(yscrollcommand='')
+    try:
+        insert = tree.insert
+        return [insert('', 'end', values=values) for values in rows]
+    finally:
+        tree.configure(yscrollcommand=yscrollcommand)
+
+def _resupply_cigar_values(cigar):
+    """Row values for one cigar in a resupply order being built."""
+    return (
+        cigar.get('brand', ''),
+        cigar.get('cigar', ''),
+        cigar.get('size', ''),
+        cigar.get('type', ''),
+        str(cigar.get('count', 0)),
+        "$%.2f" % cigar.get('price', 0),
+        "$%.2f" % cigar.get('proportional_shipping', 0),
+        "$%.2f" % cigar.get('proportional_tax', 0),
+        "$%.2f" % cigar.get('price_per_stick', 0)
+    )
+
+def _resupply_detail_values(resupply):
+    """Detail row values for one resupply record."""
+    return (
+        resupply.get('brand', 'Unknown'),
+        resupply.get('cigar', 'Unknown'),
+        resupply.get('size', 'N/A'),
+        resupply.get('type', 'N/A'),
+        str(int(resupply.get('quantity', 1))),
+        "$%.2f" % float(resupply.get('price', 0)),
+        "$%.2f" % float(resupply.get('shipping_tax', 0)),
+        "$%.2f" % float(resupply.get('total_cost', 0))
+    )
+
+def _cigar_identity(cigar):
+    """Lowercased (brand, cigar, size) that marks two inventory records as the same cigar."""
+    return (cigar.get('brand', '').lower(), cigar.get('cigar', '').lower(), cigar.get('size', '').lower())
+
+def _allocate_resupply_costs(order, total_shipping, tax_rate):
+    """Spread shipping over an order by stick count and add tax; sets each cigar's costs and returns the total tax."""
+    total_cigars = sum(cigar['count'] for cigar in order)
+    shipping_per_cigar = total_shipping / total_cigars if total_cigars else 0
+    total_tax = 0
+    for cigar in order:
+        count = cigar['count']
+        if count > 0 and total_cigars:
+            shipping = shipping_per_cigar * count
+            # Tax per stick times the stick count is just tax on the base price
+            tax = cigar['price'] * tax_rate
+            cigar['proportional_shipping'] = shipping
+            cigar['proportional_tax'] = tax
+            cigar['price_per_stick'] = (cigar['price'] + tax + shipping) / count
+            total_tax += tax
+        else:
+            cigar['proportional_shipping'] = shipping_per_cigar * count
+            cigar['proportional_tax'] = 0
+            cigar['price_per_stick'] = 0
+    return total_tax
+
+def _transaction_summary(sales):
+    """Summary row values (date, items, total) for one transaction's sales."""
+    total_items = sum(sale.get('quantity', 1) for sale in sales)
+    total_value = sum(sale.get('total_cost', 0) for sale in sales)
+    # Use the date from the first sale in the transaction
+    return (sales[0].get('date', 'Unknown'), str(total_items), "$%.2f" % total_value)
+
+def _resupply_order_summary(resupplies):
+    """Summary row values (date, items, cost, shipping) for one resupply order."""
+    total_items = sum(int(resupply.get('quantity', 1)) for resupply in resupplies)
+    total_cost = sum(float(resupply.get('total_cost', 0)) for resupply in resupplies)
+    total_shipping = sum(float(resupply.get('shipping_tax', 0)) for resupply in resupplies)
+    date = resupplies[0].get('date', 'Unknown')
+    return (date, str(total_items), "$%.2f" % total_cost, "$%.2f" % total_shipping)
+
+def _json_bytes(obj):
+    """Serialize obj to compact UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _write_atomic(path, data):
+    """Write bytes to path through a temp file so readers never see a partial file."""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb', buffering=1 << 16) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave a half-written temp file next to the intact original
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _data_file_title(path):
+    """Readable name of a data file for messages, e.g. 'sales history'."""
+    return os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+
+def _append_bytes(path, data):
+    """Append bytes to the end of path and flush them to disk, as _write_atomic does."""
+    with open(path, 'ab', buffering=1 << 16) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _to_number(value, kind, record):
+    """Convert a stored value to int or float, using 0 for text that isn't a number."""
+    try:
+        return kind(float(value)) if kind is int else kind(value)
+    except (TypeError, ValueError):
+        print(f"Invalid {kind.__name__} value {value!r} in {record.get('cigar', 'record')}, using 0")
+        return kind(0)
+
+def _sale_log_state(sale):
+    """Fields a return can change on a logged sale record."""
+    return (sale.get('quantity'), sale.get('total_cost'))
+
+def _resupply_log_state(resupply):
+    """Fields a return can change on a logged resupply record."""
+    return (resupply.get('quantity'), resupply.get('price'), resupply.get('shipping_tax'),
+            resupply.get('total_cost'))
+
+def _write_xlsx(path, records):
+    """Write dict records to an .xlsx sheet, one column per key, with xlsxwriter or else openpyxl."""
+    # Every key, in order of first appearance, as a DataFrame export would have them
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    # Nested values such as purchase_history have no cell type; write their text
+    rows = ([value if value is None or isinstance(value, (str, int, float)) else str(value)
+             for value in map(record.get, columns)]
+            for record in records)
+    if not XLSXWRITER_AVAILABLE:
+        # Raises ImportError when neither engine is installed
+        from openpyxl import Workbook
+        # Write-only mode streams rows out instead of building a cell tree
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(columns)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+        return
+    # constant_memory flushes each row to disk as soon as the next one starts
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, columns)
+        for row_number, row in enumerate(rows, start=1):
+            sheet.write_row(row_number, 0, row)
+    finally:
+        workbook.close()
+
+def _parse_json(data):
+    """Parse JSON from bytes or a buffer, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity that older stdlib-written files may hold
+            pass
+    return json.loads(bytes(data))
+
+def _load_json(path):
+    """Load a JSON file, parsing it straight from a memory map with orjson."""
+    with open(path, 'rb') as f:
+        # An empty file can't be mapped; let the parser report it as invalid JSON
+        if ORJSON_AVAILABLE and os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                with memoryview(m) as view:
+                    return _parse_json(view)
+        return json.load(f)
+
+@functools.lru_cache(maxsize=32)
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     try:
@@ -35,6 +286,266 @@ def resource_path(relative_path):
         print(f"Error in resource_path: {e}")
         return relative_path
 
+@functools.lru_cache(maxsize=4096)
+def _price_per_stick(price, shipping, count, original_quantity, tax_rate):
+    """Price per stick including tax and shipping, memoized on its inputs."""
+    try:
+        price = float(price)
+        shipping = float(shipping)
+        count = int(count)
+        
+        if count <= 0:
+            return 0
+            
+        # Calculate base price per stick
+        price_per_stick = price / count
+        
+        # Add tax to the base price
+        price_with_tax = price_per_stick * (1 + tax_rate)
+        
+        # If original_quantity is provided (new cigars), use it for shipping
+        # Otherwise (existing cigars, or a count that was reset to 0), use current count
+        shipping_quantity = original_quantity or count
+        shipping_per_stick = shipping / shipping_quantity
+        
+        # Total cost per stick
+        total_per_stick = price_with_tax + shipping_per_stick
+        
+        return total_per_stick
+        
+    except (ValueError, TypeError):
+        return 0
+
+class VirtualTree:
+    """Keep a Treeview in sync with a row list, materializing only the visible window for long lists."""
+    
+    def __init__(self, tree, scrollbar, style='Treeview', threshold=VIRTUAL_TREE_THRESHOLD):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.style = style
+        self.threshold = threshold
+        self.rows = []  # (record, values) for every row after filtering and sorting
+        self.virtual = False
+        self.first = 0  # Index in rows of the top displayed row when virtual
+        self.iid_by_record = {}  # id(record) -> tree iid
+        self.record_by_iid = {}  # tree iid -> record shown in that row
+        self.selected = set()  # ids of the selected records, including rows scrolled out of the window
+        self._values = {}  # tree iid -> values last written to that row
+        self._iid_counter = 0
+        self._row_height = None  # Looked up from the style on first use
+        self._height = None  # Tree height from its last <Configure> event
+        
+        # The scrollbar talks to this helper, which forwards to the tree unless virtual
+        scrollbar.configure(command=self.on_scrollbar)
+        tree.configure(yscrollcommand=self.on_yscroll)
+        tree.bind('<Configure>', self.on_configure, add='+')
+        tree.bind('<<TreeviewSelect>>', self.on_select, add='+')
+        # The window ends at the last materialized row, so the keys move it past the edges
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>'):
+            tree.bind(key, self.on_key, add='+')
+    
+    def show(self, rows, selected=None):
+        """Display (record, values) rows, windowing them when there are many.
+        
+        selected holds the ids of the records to keep selected and defaults to the current selection.
+        """
+        if selected is None:
+            selected = self.selected_records()
+        self.rows = rows
+        # Forget selected records that are no longer listed
+        self.selected = {id(record) for record, _ in rows if id(record) in selected} if selected else set()
+        selected = self.selected
+        self.virtual = len(rows) > self.threshold
+        if self.virtual:
+            page = self.visible_row_count()
+            self.first = max(0, min(self.first, len(rows) - page))
+            rows = rows[self.first:self.first + page]
+        else:
+            self.first = 0
+        self.apply(rows, selected)
+        if self.virtual:
+            # The window holds exactly one screen, so keep the tree itself unscrolled
+            self.tree.yview_moveto(0)
+            self.on_yscroll(0, 1)
+    
+    def apply(self, rows, selected=None):
+        """Make the tree show exactly these rows, touching only the ones that changed."""
+        tree = self.tree
+        reselect = []
+        # Reuse each record's row; rewrite it only if its values changed
+        existing = set(tree.get_children())
+        iid_by_record = {}
+        record_by_iid = {}
+        row_values = {}
+        order = []
+        for record, values in rows:
+            item_id = self.iid_by_record.get(id(record))
+            if item_id is None or item_id not in existing or item_id in row_values:
+                self._iid_counter += 1
+                item_id = f"row{self._iid_counter}"
+                tree.insert('', 'end', iid=item_id, values=values)
+            else:
+                previous = self._values.get(item_id)
+                if previous is not values and previous != values:
+                    tree.item(item_id, values=values)
+            iid_by_record[id(record)] = item_id
+            record_by_iid[item_id] = record
+            row_values[item_id] = values
+            order.append(item_id)
+            
+            # Restore selection if this was a previously selected item
+            if selected and id(record) in selected:
+                reselect.append(item_id)
+        
+        # Drop rows that are gone or filtered out, then fix the order in one call
+        stale = existing.difference(row_values)
+        if stale:
+            tree.delete(*stale)
+        if order != list(tree.get_children()):
+            tree.set_children('', *order)
+        if reselect:
+            tree.selection_add(*reselect)
+            tree.see(reselect[0])  # Make sure the item is visible
+        self.iid_by_record = iid_by_record
+        self.record_by_iid = record_by_iid
+        self._values = row_values
+    
+    def update_rows(self, changed):
+        """Rewrite the (record, values) rows of these records in place, keeping their order."""
+        changed = {id(record): (record, values) for record, values in changed}
+        rows = self.rows
+        for index, (record, _) in enumerate(rows):
+            row = changed.get(id(record))
+            if row is None:
+                continue
+            rows[index] = row
+            # Only rows inside the current window exist in the tree
+            item_id = self.iid_by_record.get(id(record))
+            if item_id is not None and self._values.get(item_id) != row[1]:
+                self.tree.item(item_id, values=row[1])
+                self._values[item_id] = row[1]
+    
+    def selected_records(self):
+        """Return the ids of the records behind the selected rows, in or out of the window."""
+        self.on_select()
+        return set(self.selected)
+    
+    def select(self, item_id, extend=False):
+        """Select the row item_id, replacing the whole selection unless extend is set."""
+        record = self.record_by_iid.get(item_id)
+        if record is None:
+            return
+        if extend:
+            self.selected.add(id(record))
+            self.tree.selection_add(item_id)
+        else:
+            self.selected = {id(record)}
+            self.tree.selection_set(item_id)
+    
+    def clear_selection(self):
+        """Deselect every row, including those scrolled out of the window."""
+        self.selected = set()
+        self.tree.selection_remove(self.tree.selection())
+    
+    def on_select(self, event=None):
+        """Take the selection of the materialized rows from the tree and keep the rest."""
+        record_by_iid = self.record_by_iid
+        shown = {id(record) for record in record_by_iid.values()}
+        self.selected.difference_update(shown)
+        self.selected.update(id(record_by_iid[iid]) for iid in self.tree.selection() if iid in record_by_iid)
+    
+    def on_key(self, event):
+        """Arrow and page key handler that moves the row window when the focus is at its edge."""
+        if not self.virtual:
+            return None
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        if focus not in children:
+            return None
+        page = len(children)
+        index = self.first + children.index(focus)
+        if event.keysym == 'Up':
+            if focus != children[0]:
+                return None
+            target = index - 1
+        elif event.keysym == 'Down':
+            if focus != children[-1]:
+                return None
+            target = index + 1
+        elif event.keysym == 'Prior':
+            target = index - page
+        else:
+            target = index + page
+        target = max(0, min(target, len(self.rows) - 1))
+        if target == index:
+            return 'break'
+        
+        # Keep the focused row at the same height on screen, as the tree itself would
+        self.scroll_to(self.first + target - index)
+        item_id = self.iid_by_record.get(id(self.rows[target][0]))
+        if item_id is not None:
+            self.select(item_id, extend=bool(event.state & 0x1))  # Shift extends the selection
+            self.tree.focus(item_id)
+        return 'break'
+    
+    def on_configure(self, event):
+        """Remember the tree's new height and refill the row window to match it."""
+        self._height = event.height
+        self.scroll_to(self.first, force=True)
+    
+    def visible_row_count(self):
+        """Number of rows that fit in the tree."""
+        # Called on every scroll step, so avoid a style lookup and a winfo query each time;
+        # the theme is set up before any tree is built
+        if self._row_height is None:
+            self._row_height = int(ttk.Style().lookup(self.style, 'rowheight') or 28)
+        height = self._height if self._height is not None else self.tree.winfo_height()
+        heading_height = 30
+        return max(1, (height - heading_height) // self._row_height)
+    
+    def on_yscroll(self, first, last):
+        """Drive the scrollbar from the tree, or from the window position when virtual."""
+        if self.virtual:
+            total = len(self.rows)
+            first = self.first / total
+            last = min(self.first + self.visible_row_count(), total) / total
+        self.scrollbar.set(first, last)
+    
+    def on_scrollbar(self, *args):
+        """Scrollbar and mouse wheel handler that moves the row window when virtual."""
+        if not self.virtual:
+            self.tree.yview(*args)
+            return
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_row_count()
+            self.scroll_to(self.first + step)
+    
+    def scroll_to(self, first, force=False):
+        """Show the window of rows starting at index first."""
+        if not self.virtual:
+            return
+        page = self.visible_row_count()
+        first = max(0, min(first, len(self.rows) - page))
+        if first != self.first or force:
+            self.first = first
+            self.on_select()
+            self.apply(self.rows[first:first + page], self.selected)
+            self.tree.yview_moveto(0)
+        self.on_yscroll(0, 1)
+    
+    def reveal(self, record):
+        """Scroll a record into view and return its tree iid, if it is displayed."""
+        if self.virtual and id(record) not in self.iid_by_record:
+            for index, (row_record, _) in enumerate(self.rows):
+                if row_record is record:
+                    self.scroll_to(index - self.visible_row_count() // 2)
+                    break
+        return self.iid_by_record.get(id(record))
+
 class CigarInventory:
     def __init__(self, root):
         self.root = root
@@ -43,6 +554,14 @@ class CigarInventory:
         
         # Initialize data directory (start with project directory for safety)
         self.data_directory = os.path.abspath(".")
+        self._data_paths = {}  # (data directory, filename) -> joined path
+        self._prefetched = {}  # Data file path -> Future from _prefetch_data_files
+        # Threads start on first use and idle between loads instead of being spawned per load
+        self._reader = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # One writer thread, so writes to the same file land in the order they were made
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._pending_writes = []  # (what, path, Future) for writes not yet checked for errors
+        self._write_check_id = None
         self.humidor_name = "Default"
         
         # Apply modern styling
@@ -76,14 +595,38 @@ class CigarInventory:
         
         # Data storage
         self.inventory = []
+        self.inventory_by_name = {}  # Cigar name -> inventory record for O(1) edits
+        self._indexed_inventory = None
+        self._dropped_names = set()  # Names whose index entry went with a rename or removal; another record may share them
         self.brands = set()
         self.sizes = set()
         self.types = set()
+        self._sorted_cache = {}  # Set name -> (set, size, sorted list, sorted list with blank)
         self.tax_rate = 0.086
         self.checkbox_states = {}
         self.sales_history = []
+        self._sales_index_state = (None, 0, {})  # (history list indexed, sales indexed, transaction_id -> sales)
+        self._record_logs = {}  # Log filename -> (path, {record id: state as last written})
         self.resupply_history = []
         self.stored_quantities = {}  # New dictionary to store quantities persistently
+        self._dirty_inventory = False  # Inline edits waiting for a debounced save
+        self._flush_after_id = None
+        self._order_total_after_id = None  # Pending order total update from typed quantities
+        self._resupply_costs_after_id = None  # Pending resupply cost update from typed shipping/tax
+        self._active_popup = None  # Inline editor widget currently shown over the tree
+        self._row_cache = {}  # id(inventory record) -> (source fields, (unchecked row, checked row))
+        self._row_cache_tax_rate = None
+        self._inventory_generation = 0  # Bumped whenever inventory edits are saved or scheduled to be
+        self._identity_index_state = (None, None, {}, {})  # (inventory indexed, size, identity -> records, id(record) -> identity)
+        self._cigar_choices_cache = None  # ((inventory, size, generation), sorted names, brand -> names, brand -> sorted names)
+        self._sort_key_cache = {}  # column -> {raw field value: sort key}
+        self._inventory_sorted_by = None  # (id(inventory), column, reverse) after sort_treeview
+        self._inventory_totals = None  # (count, value, shipping, items with stock) last computed
+        self._totals_text = None  # Label texts last shown by update_inventory_totals
+        self._sale_row_cache = {}  # id(sale record) -> (source fields, detail row values)
+        self._written_name_sets = {}  # File path -> brand/size/type set last written to it
+        self._written_files = {}  # File path -> bytes last written there by a whole-file save
+        self._parent_geom = None  # Main window (x, y, width, height), kept current by <Configure>
         
         # Create main container
         main_container = ttk.Frame(root)
@@ -118,6 +661,7 @@ class CigarInventory:
         
         # Ensure proper cleanup
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind('<Configure>', self._on_root_configure, add='+')
 
     def setup_modern_theme(self):
         """Apply modern styling to make the app look more contemporary."""
@@ -434,12 +978,12 @@ class CigarInventory:
         ttk.Label(add_frame, text="Brand:").pack(anchor='w', pady=(0, 5))
         self.resupply_brand_var = tk.StringVar()
         self.resupply_brand_combo = ttk.Combobox(add_frame, textvariable=self.resupply_brand_var, 
-                                               values=sorted(list(self.brands)), width=25)
+                                               values=self._sorted_choices('brands'), width=25)
         self.resupply_brand_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(add_frame, text="Cigar:").pack(anchor='w', pady=(0, 5))
         self.resupply_cigar_var = tk.StringVar()
-        existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
+        existing_cigars = self._cigar_name_choices()
         self.resupply_cigar_combo = ttk.Combobox(add_frame, textvariable=self.resupply_cigar_var, 
                                                values=existing_cigars, width=25)
         self.resupply_cigar_combo.pack(fill='x', pady=(0, 10))
@@ -447,13 +991,13 @@ class CigarInventory:
         ttk.Label(add_frame, text="Size:").pack(anchor='w', pady=(0, 5))
         self.resupply_size_var = tk.StringVar()
         self.resupply_size_combo = ttk.Combobox(add_frame, textvariable=self.resupply_size_var, 
-                                              values=sorted(list(self.sizes)), width=25)
+                                              values=self._sorted_choices('sizes'), width=25)
         self.resupply_size_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(add_frame, text="Type:").pack(anchor='w', pady=(0, 5))
         self.resupply_type_var = tk.StringVar()
         self.resupply_type_combo = ttk.Combobox(add_frame, textvariable=self.resupply_type_var, 
-                                              values=sorted(list(self.types)), width=25)
+                                              values=self._sorted_choices('types'), width=25)
         self.resupply_type_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(add_frame, text="Count:").pack(anchor='w', pady=(0, 5))
@@ -497,8 +1041,8 @@ class CigarInventory:
         self.resupply_summary_tax_label.pack(anchor='w', pady=2)
         
         # Bind events for automatic calculation
-        self.resupply_total_shipping_var.trace('w', lambda *args: self.calculate_resupply_costs())
-        self.resupply_tax_rate_var.trace('w', lambda *args: self.calculate_resupply_costs())
+        self.resupply_total_shipping_var.trace('w', self._on_resupply_cost_change)
+        self.resupply_tax_rate_var.trace('w', self._on_resupply_cost_change)
         
         # Bind brand change to update cigar dropdown
         self.resupply_brand_var.trace('w', self.update_resupply_cigar_dropdown)
@@ -506,17 +1050,17 @@ class CigarInventory:
     def refresh_resupply_dropdowns(self):
         """Refresh the resupply tab dropdown values after data is loaded."""
         # Update brand dropdown
-        self.resupply_brand_combo.config(values=sorted(list(self.brands)))
+        self.resupply_brand_combo.config(values=self._sorted_choices('brands'))
         
         # Update cigar dropdown with all existing cigars
-        existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
+        existing_cigars = self._cigar_name_choices()
         self.resupply_cigar_combo.config(values=existing_cigars)
         
         # Update size dropdown
-        self.resupply_size_combo.config(values=sorted(list(self.sizes)))
+        self.resupply_size_combo.config(values=self._sorted_choices('sizes'))
         
         # Update type dropdown  
-        self.resupply_type_combo.config(values=sorted(list(self.types)))
+        self.resupply_type_combo.config(values=self._sorted_choices('types'))
 
     def show_sales_history_window(self):
         """Show sales history in a separate window."""
@@ -548,16 +1092,9 @@ class CigarInventory:
         paned_window.add(right_frame, weight=1)
 
         # === LEFT FRAME: Transaction List ===
-        trans_columns = ('date', 'items', 'total')
-        transaction_tree = ttk.Treeview(left_frame, columns=trans_columns, show='headings', height=15)
-        
-        transaction_tree.heading('date', text='Date & Time')
-        transaction_tree.heading('items', text='Items Sold')
-        transaction_tree.heading('total', text='Total Value')
+        transaction_tree = ttk.Treeview(left_frame, columns=tuple(SALE_TRANSACTION_COLUMNS), show='headings', height=15)
         
-        transaction_tree.column('date', width=150)
-        transaction_tree.column('items', width=80)
-        transaction_tree.column('total', width=100)
+        _apply_columns(transaction_tree, SALE_TRANSACTION_COLUMNS)
 
         trans_scrollbar = ttk.Scrollbar(left_frame, orient='vertical', command=transaction_tree.yview)
         transaction_tree.configure(yscrollcommand=trans_scrollbar.set)
@@ -566,22 +1103,9 @@ class CigarInventory:
         trans_scrollbar.pack(side='right', fill='y')
 
         # === RIGHT FRAME: Transaction Details ===
-        detail_columns = ('cigar', 'brand', 'size', 'quantity', 'price_per_stick', 'total_cost')
-        detail_tree = ttk.Treeview(right_frame, columns=detail_columns, show='headings', height=10)
-        
-        detail_tree.heading('cigar', text='Cigar')
-        detail_tree.heading('brand', text='Brand')
-        detail_tree.heading('size', text='Size')
-        detail_tree.heading('quantity', text='Qty')
-        detail_tree.heading('price_per_stick', text='Price/Stick')
-        detail_tree.heading('total_cost', text='Total')
-        
-        detail_tree.column('cigar', width=120)
-        detail_tree.column('brand', width=100)
-        detail_tree.column('size', width=70)
-        detail_tree.column('quantity', width=50)
-        detail_tree.column('price_per_stick', width=80)
-        detail_tree.column('total_cost', width=80)
+        detail_tree = ttk.Treeview(right_frame, columns=tuple(SALE_DETAIL_COLUMNS), show='headings', height=10)
+        
+        _apply_columns(detail_tree, SALE_DETAIL_COLUMNS)
 
         detail_scrollbar = ttk.Scrollbar(right_frame, orient='vertical', command=detail_tree.yview)
         detail_tree.configure(yscrollcommand=detail_scrollbar.set)
@@ -592,64 +1116,46 @@ class CigarInventory:
         # Local variables for this window
         current_transaction_id = None
         transaction_id_map = {}
+        unlisted_transactions = deque()  # Newest first; listed a page at a time as the list is scrolled
+
+        def list_transaction_page(page_size=200):
+            # Taken off the front one by one, so each page costs its own length
+            page = [unlisted_transactions.popleft() for _ in range(min(page_size, len(unlisted_transactions)))]
+            for transaction_id, sales in page:
+                try:
+                    item_id = transaction_tree.insert('', 'end', values=_transaction_summary(sales))
+                    transaction_id_map[item_id] = transaction_id
+                except Exception as e:
+                    print(f"Error displaying transaction {transaction_id}: {e}")
+
+        def on_transaction_scroll(first, last):
+            trans_scrollbar.set(first, last)
+            if unlisted_transactions and float(last) > 0.9:
+                list_transaction_page()
+
+        transaction_tree.configure(yscrollcommand=on_transaction_scroll)
 
         def refresh_local_display():
             """Refresh the local window display."""
             # Clear transaction display
-            for item in transaction_tree.get_children():
-                transaction_tree.delete(item)
+            transaction_tree.delete(*transaction_tree.get_children())
             detail_tree.delete(*detail_tree.get_children())
             
             # Reload and redisplay transactions
             self.load_sales_history()
             
-            # Group sales by transaction_id
-            transactions = {}
-            for sale in self.sales_history:
-                transaction_id = sale.get('transaction_id', 'unknown')
-                if transaction_id not in transactions:
-                    transactions[transaction_id] = []
-                transactions[transaction_id].append(sale)
-            
             # Clear old mapping
             transaction_id_map.clear()
             
             # Display transactions (newest first)
-            sorted_transactions = sorted(
-                transactions.items(), 
-                key=lambda x: x[1][0].get('date', ''), 
-                reverse=True
-            )
-            
-            for transaction_id, sales in sorted_transactions:
-                try:
-                    total_items = sum(int(sale.get('quantity', 1)) for sale in sales)
-                    total_value = sum(float(sale.get('total_cost', 0)) for sale in sales)
-                    date = sales[0].get('date', 'Unknown')
-                    
-                    values = (date, str(total_items), f"${total_value:.2f}")
-                    item_id = transaction_tree.insert('', 'end', values=values)
-                    transaction_id_map[item_id] = transaction_id
-                except Exception as e:
-                    print(f"Error displaying transaction {transaction_id}: {e}")
+            unlisted_transactions.clear()
+            unlisted_transactions.extend(self._sales_by_transaction())
+            list_transaction_page()
         
         def refresh_transaction_details():
             """Refresh details for selected transaction."""
-            detail_tree.delete(*detail_tree.get_children())
-            if not current_transaction_id:
-                return
-            
-            for sale in self.sales_history:
-                if sale.get('transaction_id') == current_transaction_id:
-                    values = (
-                        sale.get('cigar', 'Unknown'),
-                        sale.get('brand', 'Unknown'),
-                        sale.get('size', 'N/A'),
-                        str(sale.get('quantity', 1)),
-                        f"${float(sale.get('price_per_stick', 0)):.2f}",
-                        f"${float(sale.get('total_cost', 0)):.2f}"
-                    )
-                    detail_tree.insert('', 'end', values=values)
+            sales = self._sales_index().get(current_transaction_id, ()) if current_transaction_id else ()
+            _fill_tree(detail_tree, [self._sale_detail_values(sale) for sale in sales])
 
         def return_selected_items_local():
             """Handle partial return of selected items from the current transaction."""
@@ -683,22 +1189,22 @@ class CigarInventory:
 
             # Process returns directly (no confirmation dialog)
             total_items = 0
+            returned_sales = set()
             for cigar_name, (brand, return_qty, max_qty) in return_quantities.items():
                 # Add back to inventory
                 for cigar in self.inventory:
                     if cigar['cigar'] == cigar_name:
-                        cigar['count'] = int(cigar['count']) + return_qty
+                        cigar['count'] += return_qty
                         break
 
                 # Update or remove sales records
-                for sale in self.sales_history:
-                    if (sale.get('transaction_id') == current_transaction_id and 
-                        sale.get('cigar') == cigar_name):
+                for sale in self._sales_index().get(current_transaction_id, ()):
+                    if sale.get('cigar') == cigar_name:
                         
                         current_sale_qty = int(sale.get('quantity', 1))
                         if return_qty >= current_sale_qty:
-                            # Remove entire sale record
-                            self.sales_history.remove(sale)
+                            # Drop the entire sale record after the loop
+                            returned_sales.add(id(sale))
                         else:
                             # Reduce quantity and recalculate cost
                             new_qty = current_sale_qty - return_qty
@@ -709,11 +1215,15 @@ class CigarInventory:
                 
                 total_items += return_qty
 
+            # Remove fully returned sale records in one pass
+            if returned_sales:
+                self.sales_history = [sale for sale in self.sales_history
+                                      if id(sale) not in returned_sales]
+
             # Save changes and refresh displays
             self.save_inventory()
             self.save_sales_history()
             self.refresh_inventory()
-            self.update_inventory_totals()
             
             # Refresh both this window and main application
             refresh_local_display()
@@ -732,24 +1242,20 @@ class CigarInventory:
             total_items = 0
             total_value = 0.0
             
-            for sale in self.sales_history:
-                if sale.get('transaction_id') == current_transaction_id:
-                    quantity = int(sale.get('quantity', 1))
-                    total_cost = float(sale.get('total_cost', 0))
-                    transaction_items.append((sale.get('cigar'), sale.get('brand'), quantity))
-                    total_items += quantity
-                    total_value += total_cost
+            for sale in self._sales_index().get(current_transaction_id, ()):
+                quantity = int(sale.get('quantity', 1))
+                total_cost = float(sale.get('total_cost', 0))
+                transaction_items.append((sale.get('cigar'), sale.get('brand'), quantity))
+                total_items += quantity
+                total_value += total_cost
 
             if not transaction_items:
                 messagebox.showwarning("Warning", "No items found in this transaction.")
                 return
 
             # Get transaction date for confirmation
-            transaction_date = "Unknown"
-            for sale in self.sales_history:
-                if sale.get('transaction_id') == current_transaction_id:
-                    transaction_date = sale.get('date', 'Unknown')
-                    break
+            transaction_sales = self._sales_index().get(current_transaction_id)
+            transaction_date = transaction_sales[0].get('date', 'Unknown') if transaction_sales else "Unknown"
 
             # Single confirmation for entire transaction
             confirm_msg = f"Are you sure you want to return the entire transaction?\n\n"
@@ -765,7 +1271,7 @@ class CigarInventory:
                 for cigar_name, _, quantity in transaction_items:
                     for cigar in self.inventory:
                         if cigar['cigar'] == cigar_name:
-                            cigar['count'] = int(cigar['count']) + quantity
+                            cigar['count'] += quantity
                             break
 
                 # Remove all sales records for this transaction
@@ -776,7 +1282,6 @@ class CigarInventory:
                 self.save_inventory()
                 self.save_sales_history()
                 self.refresh_inventory()
-                self.update_inventory_totals()
                 
                 # Refresh both this window and main application
                 refresh_local_display()
@@ -813,32 +1318,9 @@ class CigarInventory:
         # Load and display sales history
         self.load_sales_history()  # Make sure data is loaded
         
-        # Group sales by transaction_id
-        transactions = {}
-        for sale in self.sales_history:
-            transaction_id = sale.get('transaction_id', 'unknown')
-            if transaction_id not in transactions:
-                transactions[transaction_id] = []
-            transactions[transaction_id].append(sale)
-        
         # Display transactions (newest first)
-        sorted_transactions = sorted(
-            transactions.items(), 
-            key=lambda x: x[1][0].get('date', ''), 
-            reverse=True
-        )
-        
-        for transaction_id, sales in sorted_transactions:
-            try:
-                total_items = sum(int(sale.get('quantity', 1)) for sale in sales)
-                total_value = sum(float(sale.get('total_cost', 0)) for sale in sales)
-                date = sales[0].get('date', 'Unknown')
-                
-                values = (date, str(total_items), f"${total_value:.2f}")
-                item_id = transaction_tree.insert('', 'end', values=values)
-                transaction_id_map[item_id] = transaction_id
-            except Exception as e:
-                print(f"Error displaying transaction {transaction_id}: {e}")
+        unlisted_transactions.extend(self._sales_by_transaction())
+        list_transaction_page()
 
     def show_resupply_history_window(self):
         """Show resupply history in a separate window."""
@@ -870,18 +1352,9 @@ class CigarInventory:
         paned_window.add(right_frame, weight=1)
 
         # === LEFT FRAME: Resupply Orders List ===
-        resupply_columns = ('date', 'items', 'total_cost', 'total_shipping')
-        resupply_tree = ttk.Treeview(left_frame, columns=resupply_columns, show='headings', height=15)
+        resupply_tree = ttk.Treeview(left_frame, columns=tuple(RESUPPLY_ORDER_COLUMNS), show='headings', height=15)
         
-        resupply_tree.heading('date', text='Date & Time')
-        resupply_tree.heading('items', text='Items')
-        resupply_tree.heading('total_cost', text='Total Cost')
-        resupply_tree.heading('total_shipping', text='Shipping')
-        
-        resupply_tree.column('date', width=150)
-        resupply_tree.column('items', width=80)
-        resupply_tree.column('total_cost', width=100)
-        resupply_tree.column('total_shipping', width=100)
+        _apply_columns(resupply_tree, RESUPPLY_ORDER_COLUMNS)
 
         resupply_scrollbar = ttk.Scrollbar(left_frame, orient='vertical', command=resupply_tree.yview)
         resupply_tree.configure(yscrollcommand=resupply_scrollbar.set)
@@ -890,26 +1363,9 @@ class CigarInventory:
         resupply_scrollbar.pack(side='right', fill='y')
 
         # === RIGHT FRAME: Order Details ===
-        detail_columns = ('brand', 'cigar', 'size', 'type', 'quantity', 'price', 'shipping', 'total_cost')
-        resupply_detail_tree = ttk.Treeview(right_frame, columns=detail_columns, show='headings', height=15)
-        
-        resupply_detail_tree.heading('brand', text='Brand')
-        resupply_detail_tree.heading('cigar', text='Cigar')
-        resupply_detail_tree.heading('size', text='Size')
-        resupply_detail_tree.heading('type', text='Type')
-        resupply_detail_tree.heading('quantity', text='Qty')
-        resupply_detail_tree.heading('price', text='Price')
-        resupply_detail_tree.heading('shipping', text='Ship+Tax')
-        resupply_detail_tree.heading('total_cost', text='Total')
-        
-        resupply_detail_tree.column('brand', width=100)
-        resupply_detail_tree.column('cigar', width=120)
-        resupply_detail_tree.column('size', width=70)
-        resupply_detail_tree.column('type', width=80)
-        resupply_detail_tree.column('quantity', width=50)
-        resupply_detail_tree.column('price', width=80)
-        resupply_detail_tree.column('shipping', width=80)
-        resupply_detail_tree.column('total_cost', width=80)
+        resupply_detail_tree = ttk.Treeview(right_frame, columns=tuple(RESUPPLY_DETAIL_COLUMNS), show='headings', height=15)
+        
+        _apply_columns(resupply_detail_tree, RESUPPLY_DETAIL_COLUMNS)
 
         resupply_detail_scrollbar = ttk.Scrollbar(right_frame, orient='vertical', command=resupply_detail_tree.yview)
         resupply_detail_tree.configure(yscrollcommand=resupply_detail_scrollbar.set)
@@ -920,6 +1376,24 @@ class CigarInventory:
         # Local variables for this window
         current_resupply_id = None
         resupply_id_map = {}
+        unlisted_orders = deque()  # Newest first; listed a page at a time as the list is scrolled
+
+        def list_order_page(page_size=200):
+            # Taken off the front one by one, so each page costs its own length
+            page = [unlisted_orders.popleft() for _ in range(min(page_size, len(unlisted_orders)))]
+            for order_id, resupplies in page:
+                try:
+                    item_id = resupply_tree.insert('', 'end', values=_resupply_order_summary(resupplies))
+                    resupply_id_map[item_id] = order_id
+                except Exception as e:
+                    print(f"Error displaying resupply order {order_id}: {e}")
+
+        def on_order_scroll(first, last):
+            resupply_scrollbar.set(first, last)
+            if unlisted_orders and float(last) > 0.9:
+                list_order_page()
+
+        resupply_tree.configure(yscrollcommand=on_order_scroll)
 
         def delete_resupply_order():
             """Delete the selected resupply order and remove cigars from inventory."""
@@ -954,13 +1428,7 @@ class CigarInventory:
             inventory_issues = []
             for brand, cigar_name, size, quantity in order_items:
                 # Find matching cigar in inventory
-                matching_cigar = None
-                for cigar in self.inventory:
-                    if (cigar.get('brand', '').lower() == brand.lower() and
-                        cigar.get('cigar', '').lower() == cigar_name.lower() and
-                        cigar.get('size', '').lower() == size.lower()):
-                        matching_cigar = cigar
-                        break
+                matching_cigar = self.check_for_duplicate_cigar(brand, cigar_name, size)
                 
                 if not matching_cigar:
                     inventory_issues.append(f"• {brand} - {cigar_name} ({size}) not found in inventory")
@@ -1021,7 +1489,6 @@ class CigarInventory:
                 # Refresh displays
                 refresh_resupply_local_display()
                 self.refresh_inventory()
-                self.update_inventory_totals()
                 
                 # Show detailed success message
                 success_msg = "Resupply order deleted and cigars removed from inventory.\n\n"
@@ -1041,43 +1508,19 @@ class CigarInventory:
         def refresh_resupply_local_display():
             """Refresh the local resupply window display."""
             # Clear current display
-            for item in resupply_tree.get_children():
-                resupply_tree.delete(item)
+            resupply_tree.delete(*resupply_tree.get_children())
             resupply_detail_tree.delete(*resupply_detail_tree.get_children())
             
             # Reload and redisplay orders
             self.load_resupply_history()
             
-            # Group resupply records by order_id
-            orders = {}
-            for resupply in self.resupply_history:
-                order_id = resupply.get('order_id', 'unknown')
-                if order_id not in orders:
-                    orders[order_id] = []
-                orders[order_id].append(resupply)
-            
             # Clear old mapping
             resupply_id_map.clear()
             
             # Display orders (newest first)
-            sorted_orders = sorted(
-                orders.items(), 
-                key=lambda x: x[1][0].get('date', ''), 
-                reverse=True
-            )
-            
-            for order_id, resupplies in sorted_orders:
-                try:
-                    total_items = sum(int(resupply.get('quantity', 1)) for resupply in resupplies)
-                    total_cost = sum(float(resupply.get('total_cost', 0)) for resupply in resupplies)
-                    total_shipping = sum(float(resupply.get('shipping_tax', 0)) for resupply in resupplies)
-                    date = resupplies[0].get('date', 'Unknown')
-                    
-                    values = (date, str(total_items), f"${total_cost:.2f}", f"${total_shipping:.2f}")
-                    item_id = resupply_tree.insert('', 'end', values=values)
-                    resupply_id_map[item_id] = order_id
-                except Exception as e:
-                    print(f"Error displaying resupply order {order_id}: {e}")
+            unlisted_orders.clear()
+            unlisted_orders.extend(self._resupplies_by_order())
+            list_order_page()
 
         # === ACTION BUTTONS ===
         button_frame = ttk.Frame(right_frame)
@@ -1119,6 +1562,7 @@ class CigarInventory:
             total_items = 0
             returned_items = []
             skipped_items = []
+            returned_resupplies = set()
             
             for display_name, (brand_unused, return_qty, max_qty) in return_quantities.items():
                 # Parse the display name to get individual components
@@ -1168,8 +1612,8 @@ class CigarInventory:
                             
                             current_resupply_qty = int(resupply.get('quantity', 1))
                             if return_qty >= current_resupply_qty:
-                                # Remove entire resupply record
-                                self.resupply_history.remove(resupply)
+                                # Drop the entire resupply record after the loop
+                                returned_resupplies.add(id(resupply))
                             else:
                                 # Reduce quantity and recalculate cost
                                 new_qty = current_resupply_qty - return_qty
@@ -1188,11 +1632,15 @@ class CigarInventory:
                 except Exception as e:
                     skipped_items.append(f"{display_name}: processing error - {str(e)}")
 
+            # Remove fully returned resupply records in one pass
+            if returned_resupplies:
+                self.resupply_history = [resupply for resupply in self.resupply_history
+                                         if id(resupply) not in returned_resupplies]
+
             # Save changes and refresh displays
             self.save_inventory()
             self.save_resupply_history()
             self.refresh_inventory()
-            self.update_inventory_totals()
             
             # Refresh both this window and main application
             refresh_resupply_local_display()
@@ -1222,23 +1670,11 @@ class CigarInventory:
         
         def refresh_resupply_details():
             """Refresh details for selected resupply order."""
-            resupply_detail_tree.delete(*resupply_detail_tree.get_children())
-            if not current_resupply_id:
-                return
-
-            for resupply in self.resupply_history:
-                if resupply.get('order_id') == current_resupply_id:
-                    values = (
-                        resupply.get('brand', 'Unknown'),
-                        resupply.get('cigar', 'Unknown'),
-                        resupply.get('size', 'N/A'),
-                        resupply.get('type', 'N/A'),
-                        str(resupply.get('quantity', 1)),
-                        f"${float(resupply.get('price', 0)):.2f}",
-                        f"${float(resupply.get('shipping_tax', 0)):.2f}",
-                        f"${float(resupply.get('total_cost', 0)):.2f}"
-                    )
-                    resupply_detail_tree.insert('', 'end', values=values)
+            rows = []
+            if current_resupply_id:
+                rows = [_resupply_detail_values(resupply) for resupply in self.resupply_history
+                        if resupply.get('order_id') == current_resupply_id]
+            _fill_tree(resupply_detail_tree, rows)
         
         def on_resupply_select(event):
             """Handle resupply order selection."""
@@ -1259,33 +1695,9 @@ class CigarInventory:
         # Load and display resupply history
         self.load_resupply_history()  # Make sure data is loaded
         
-        # Group resupply records by order_id
-        orders = {}
-        for resupply in self.resupply_history:
-            order_id = resupply.get('order_id', 'unknown')
-            if order_id not in orders:
-                orders[order_id] = []
-            orders[order_id].append(resupply)
-        
         # Display orders (newest first)
-        sorted_orders = sorted(
-            orders.items(), 
-            key=lambda x: x[1][0].get('date', ''), 
-            reverse=True
-        )
-        
-        for order_id, resupplies in sorted_orders:
-            try:
-                total_items = sum(int(resupply.get('quantity', 1)) for resupply in resupplies)
-                total_cost = sum(float(resupply.get('total_cost', 0)) for resupply in resupplies)
-                total_shipping = sum(float(resupply.get('shipping_tax', 0)) for resupply in resupplies)
-                date = resupplies[0].get('date', 'Unknown')
-                
-                values = (date, str(total_items), f"${total_cost:.2f}", f"${total_shipping:.2f}")
-                item_id = resupply_tree.insert('', 'end', values=values)
-                resupply_id_map[item_id] = order_id
-            except Exception as e:
-                print(f"Error displaying resupply order {order_id}: {e}")
+        unlisted_orders.extend(self._resupplies_by_order())
+        list_order_page()
 
     def add_to_resupply_order(self):
         """Add a cigar to the current resupply order."""
@@ -1341,6 +1753,19 @@ class CigarInventory:
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numeric values.")
 
+    def _on_resupply_cost_change(self, *args):
+        """Recalculate resupply costs once typing in the shipping or tax field pauses."""
+        if self._resupply_costs_after_id:
+            self.root.after_cancel(self._resupply_costs_after_id)
+        self._resupply_costs_after_id = self.root.after(80, self._flush_resupply_costs)
+
+    def _flush_resupply_costs(self):
+        """Run a pending resupply cost recalculation now."""
+        if self._resupply_costs_after_id:
+            self.root.after_cancel(self._resupply_costs_after_id)
+            self._resupply_costs_after_id = None
+            self.calculate_resupply_costs()
+
     def calculate_resupply_costs(self):
         """Calculate proportional shipping and tax for all cigars in resupply order."""
         try:
@@ -1351,39 +1776,7 @@ class CigarInventory:
             # Update the humidor's tax rate
             self.tax_rate = tax_rate
             
-            # Calculate total cigars
-            total_cigars = sum(cigar['count'] for cigar in self.current_resupply_order)
-            
-            if total_cigars == 0:
-                for cigar in self.current_resupply_order:
-                    cigar['proportional_shipping'] = 0
-                    cigar['proportional_tax'] = 0
-                    cigar['price_per_stick'] = 0
-                self.resupply_total_tax_label.config(text="$0.00")
-                self.refresh_resupply_cigars_display()
-                return
-            
-            total_tax_amount = 0
-            shipping_per_cigar = total_shipping / total_cigars
-            
-            # Update each cigar with proportional costs
-            for cigar in self.current_resupply_order:
-                cigar_count = cigar['count']
-                base_price = cigar['price']
-                
-                # Calculate proportional shipping
-                cigar['proportional_shipping'] = shipping_per_cigar * cigar_count
-                
-                # Calculate tax
-                base_price_per_stick = base_price / cigar_count if cigar_count > 0 else 0
-                tax_per_stick = base_price_per_stick * tax_rate
-                cigar['proportional_tax'] = tax_per_stick * cigar_count
-                
-                total_tax_amount += cigar['proportional_tax']
-                
-                # Calculate price per stick
-                total_cost = base_price + cigar['proportional_tax'] + cigar['proportional_shipping']
-                cigar['price_per_stick'] = total_cost / cigar_count if cigar_count > 0 else 0
+            total_tax_amount = _allocate_resupply_costs(self.current_resupply_order, total_shipping, tax_rate)
             
             # Update displays
             self.resupply_total_tax_label.config(text=f"${total_tax_amount:.2f}")
@@ -1400,24 +1793,7 @@ class CigarInventory:
 
     def refresh_resupply_cigars_display(self):
         """Refresh the resupply cigars treeview display."""
-        # Clear existing items
-        for item in self.resupply_cigars_tree.get_children():
-            self.resupply_cigars_tree.delete(item)
-        
-        # Add all cigars
-        for cigar in self.current_resupply_order:
-            values = (
-                cigar.get('brand', ''),
-                cigar.get('cigar', ''),
-                cigar.get('size', ''),
-                cigar.get('type', ''),
-                str(cigar.get('count', 0)),
-                f"${cigar.get('price', 0):.2f}",
-                f"${cigar.get('proportional_shipping', 0):.2f}",
-                f"${cigar.get('proportional_tax', 0):.2f}",
-                f"${cigar.get('price_per_stick', 0):.2f}"
-            )
-            self.resupply_cigars_tree.insert('', 'end', values=values)
+        _fill_tree(self.resupply_cigars_tree, [_resupply_cigar_values(cigar) for cigar in self.current_resupply_order])
 
     def update_resupply_summary(self):
         """Update the resupply summary display."""
@@ -1433,10 +1809,7 @@ class CigarInventory:
         """Update cigar dropdown based on selected brand."""
         selected_brand = self.resupply_brand_var.get().strip()
         if selected_brand:
-            filtered_cigars = sorted(list(set(
-                cigar.get('cigar', '') for cigar in self.inventory 
-                if cigar.get('cigar', '') and cigar.get('brand', '').lower() == selected_brand.lower()
-            )))
+            filtered_cigars = self._cigar_name_choices(selected_brand)
             self.resupply_cigar_combo.config(values=filtered_cigars)
             current_cigar = self.resupply_cigar_var.get()
             if current_cigar and current_cigar not in filtered_cigars:
@@ -1444,7 +1817,7 @@ class CigarInventory:
             if len(filtered_cigars) == 1:
                 self.resupply_cigar_var.set(filtered_cigars[0])
         else:
-            existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
+            existing_cigars = self._cigar_name_choices()
             self.resupply_cigar_combo.config(values=existing_cigars)
 
     def remove_from_resupply_order(self):
@@ -1511,25 +1884,25 @@ class CigarInventory:
         ttk.Label(main_frame, text="Brand:").pack(anchor='w', pady=(0, 5))
         brand_var = tk.StringVar(value=cigar_data['brand'])
         brand_combo = ttk.Combobox(main_frame, textvariable=brand_var, 
-                                  values=sorted(list(self.brands)), width=30)
+                                  values=self._sorted_choices('brands'), width=30)
         brand_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(main_frame, text="Cigar:").pack(anchor='w', pady=(0, 5))
         cigar_var = tk.StringVar(value=cigar_data['cigar'])
         cigar_combo = ttk.Combobox(main_frame, textvariable=cigar_var, 
-                                  values=sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', '')))), width=30)
+                                  values=self._cigar_name_choices(), width=30)
         cigar_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(main_frame, text="Size:").pack(anchor='w', pady=(0, 5))
         size_var = tk.StringVar(value=cigar_data['size'])
         size_combo = ttk.Combobox(main_frame, textvariable=size_var, 
-                                 values=sorted(list(self.sizes)), width=30)
+                                 values=self._sorted_choices('sizes'), width=30)
         size_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(main_frame, text="Type:").pack(anchor='w', pady=(0, 5))
         type_var = tk.StringVar(value=cigar_data['type'])
         type_combo = ttk.Combobox(main_frame, textvariable=type_var, 
-                                 values=sorted(list(self.types)), width=30)
+                                 values=self._sorted_choices('types'), width=30)
         type_combo.pack(fill='x', pady=(0, 10))
         
         ttk.Label(main_frame, text="Count:").pack(anchor='w', pady=(0, 5))
@@ -1596,6 +1969,9 @@ class CigarInventory:
             messagebox.showwarning("Warning", "Please add items to the order.")
             return
         
+        # Costs typed in just before clicking may not have been applied yet
+        self._flush_resupply_costs()
+        
         try:
             added_count = 0
             combined_details = []
@@ -1664,6 +2040,7 @@ class CigarInventory:
                     }
                     
                     self.inventory.append(new_cigar)
+                    self._index_cigar(new_cigar)
                     added_count += 1
             
             # Save all changes
@@ -1678,7 +2055,6 @@ class CigarInventory:
             self.current_resupply_order.clear()
             self.calculate_resupply_costs()
             self.refresh_inventory()
-            self.update_inventory_totals()
             self.refresh_resupply_dropdowns()
             
             # Show success message
@@ -1762,6 +2138,8 @@ Version: 2.0
         search_frame.pack(fill='x', pady=(0, 5))
         ttk.Label(search_frame, text="Search:").pack(side='left', padx=5)
         self.search_var = tk.StringVar()
+        self._search_after_id = None
+        self._shown_search_term = None  # Search text the tree rows were last filtered by
         self.search_var.trace_add('write', self.on_search)
         ttk.Entry(search_frame, textvariable=self.search_var, style='Modern.TEntry').pack(side='left', fill='x', expand=True)
         
@@ -1777,20 +2155,28 @@ Version: 2.0
         columns = ('select', 'brand', 'cigar', 'size', 'type', 'count', 'price', 'shipping', 
                   'per_stick', 'personal_rating')
         self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', style='Modern.Treeview')
+        # Column id ('#1', '#2', ...) -> name, so clicks don't query Tk for the columns
+        self._columns_tuple = columns
+        self._col_by_id = {f'#{i + 1}': c for i, c in enumerate(columns)}
+        self._build_popup_editors()
         
-        # Add scrollbars
-        tree_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        # Add scrollbars; the vertical one is driven by the virtual tree helper
+        self.tree_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical')
         tree_xscrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.tree.xview)
-        self.tree.configure(yscrollcommand=tree_scrollbar.set, xscrollcommand=tree_xscrollbar.set)
+        self.tree.configure(xscrollcommand=tree_xscrollbar.set)
+        
+        # Large inventories show a window of rows that follows the scrollbar;
+        # it also tracks which inventory record each row shows
+        self.inventory_view = VirtualTree(self.tree, self.tree_scrollbar, style='Modern.Treeview')
         
         # Pack scrollbars and treeview
-        tree_scrollbar.pack(side='right', fill='y')
+        self.tree_scrollbar.pack(side='right', fill='y')
         tree_xscrollbar.pack(side='bottom', fill='x')
         self.tree.pack(side='left', expand=True, fill='both')
         
         # Add mouse wheel scrolling for inventory
         def on_mousewheel(event):
-            self.tree.yview_scroll(int(-1 * (event.delta / 120)), "units")
+            self.inventory_view.on_scrollbar('scroll', int(-1 * (event.delta / 120)), 'units')
         self.tree.bind('<MouseWheel>', on_mousewheel)
         
         # Add totals frame at the bottom of the left frame
@@ -1860,8 +2246,8 @@ Version: 2.0
         
         # Bind events
         self.tree.bind('<Button-1>', self.handle_click)
-        self.tree.bind('<Double-1>', lambda e: setattr(e, 'double', True) or self.handle_click(e))
-        self.tree.bind('<Button-3>', lambda e: self.tree.selection_remove(self.tree.selection()))
+        self.tree.bind('<Double-Button-1>', self.handle_double_click)
+        self.tree.bind('<Button-3>', lambda e: self.inventory_view.clear_selection())
         
         # Bind Delete key to remove selected items
         self.tree.bind('<Delete>', lambda event: self.remove_selected())
@@ -1886,17 +2272,10 @@ Version: 2.0
 
         # === LEFT FRAME: Transaction List ===
         # Treeview for transactions (grouped by transaction_id)
-        trans_columns = ('date', 'items', 'total')
-        self.transaction_tree = ttk.Treeview(left_frame, columns=trans_columns, show='headings', height=15)
+        self.transaction_tree = ttk.Treeview(left_frame, columns=tuple(SALE_TRANSACTION_COLUMNS), show='headings', height=15)
         
         # Configure transaction columns
-        self.transaction_tree.heading('date', text='Date & Time')
-        self.transaction_tree.heading('items', text='Items Sold')
-        self.transaction_tree.heading('total', text='Total Value')
-        
-        self.transaction_tree.column('date', width=150)
-        self.transaction_tree.column('items', width=80)
-        self.transaction_tree.column('total', width=100)
+        _apply_columns(self.transaction_tree, SALE_TRANSACTION_COLUMNS)
 
         # Add scrollbar for transactions
         trans_scrollbar = ttk.Scrollbar(left_frame, orient='vertical', command=self.transaction_tree.yview)
@@ -1908,23 +2287,10 @@ Version: 2.0
 
         # === RIGHT FRAME: Transaction Details ===
         # Treeview for individual items in selected transaction
-        detail_columns = ('cigar', 'brand', 'size', 'quantity', 'price_per_stick', 'total_cost')
-        self.detail_tree = ttk.Treeview(right_frame, columns=detail_columns, show='headings', height=10)
+        self.detail_tree = ttk.Treeview(right_frame, columns=tuple(SALE_DETAIL_COLUMNS), show='headings', height=10)
         
         # Configure detail columns
-        self.detail_tree.heading('cigar', text='Cigar')
-        self.detail_tree.heading('brand', text='Brand')
-        self.detail_tree.heading('size', text='Size')
-        self.detail_tree.heading('quantity', text='Qty')
-        self.detail_tree.heading('price_per_stick', text='Price/Stick')
-        self.detail_tree.heading('total_cost', text='Total')
-        
-        self.detail_tree.column('cigar', width=120)
-        self.detail_tree.column('brand', width=100)
-        self.detail_tree.column('size', width=70)
-        self.detail_tree.column('quantity', width=50)
-        self.detail_tree.column('price_per_stick', width=80)
-        self.detail_tree.column('total_cost', width=80)
+        _apply_columns(self.detail_tree, SALE_DETAIL_COLUMNS)
 
         # Add scrollbar for details
         detail_scrollbar = ttk.Scrollbar(right_frame, orient='vertical', command=self.detail_tree.yview)
@@ -1972,19 +2338,10 @@ Version: 2.0
 
         # === LEFT FRAME: Resupply Orders List ===
         # Treeview for resupply orders (grouped by order_id)
-        resupply_columns = ('date', 'items', 'total_cost', 'total_shipping')
-        self.resupply_tree = ttk.Treeview(left_frame, columns=resupply_columns, show='headings', height=15)
+        self.resupply_tree = ttk.Treeview(left_frame, columns=tuple(RESUPPLY_ORDER_COLUMNS), show='headings', height=15)
         
         # Configure resupply columns
-        self.resupply_tree.heading('date', text='Date & Time')
-        self.resupply_tree.heading('items', text='Items')
-        self.resupply_tree.heading('total_cost', text='Total Cost')
-        self.resupply_tree.heading('total_shipping', text='Shipping')
-        
-        self.resupply_tree.column('date', width=150)
-        self.resupply_tree.column('items', width=80)
-        self.resupply_tree.column('total_cost', width=100)
-        self.resupply_tree.column('total_shipping', width=100)
+        _apply_columns(self.resupply_tree, RESUPPLY_ORDER_COLUMNS)
 
         # Add scrollbar for resupply orders
         resupply_scrollbar = ttk.Scrollbar(left_frame, orient='vertical', command=self.resupply_tree.yview)
@@ -1996,27 +2353,10 @@ Version: 2.0
 
         # === RIGHT FRAME: Order Details ===
         # Treeview for individual items in selected resupply order
-        detail_columns = ('brand', 'cigar', 'size', 'type', 'quantity', 'price', 'shipping', 'total_cost')
-        self.resupply_detail_tree = ttk.Treeview(right_frame, columns=detail_columns, show='headings', height=15)
+        self.resupply_detail_tree = ttk.Treeview(right_frame, columns=tuple(RESUPPLY_DETAIL_COLUMNS), show='headings', height=15)
         
         # Configure detail columns
-        self.resupply_detail_tree.heading('brand', text='Brand')
-        self.resupply_detail_tree.heading('cigar', text='Cigar')
-        self.resupply_detail_tree.heading('size', text='Size')
-        self.resupply_detail_tree.heading('type', text='Type')
-        self.resupply_detail_tree.heading('quantity', text='Qty')
-        self.resupply_detail_tree.heading('price', text='Price')
-        self.resupply_detail_tree.heading('shipping', text='Ship+Tax')
-        self.resupply_detail_tree.heading('total_cost', text='Total')
-        
-        self.resupply_detail_tree.column('brand', width=100)
-        self.resupply_detail_tree.column('cigar', width=120)
-        self.resupply_detail_tree.column('size', width=70)
-        self.resupply_detail_tree.column('type', width=80)
-        self.resupply_detail_tree.column('quantity', width=50)
-        self.resupply_detail_tree.column('price', width=80)
-        self.resupply_detail_tree.column('shipping', width=80)
-        self.resupply_detail_tree.column('total_cost', width=80)
+        _apply_columns(self.resupply_detail_tree, RESUPPLY_DETAIL_COLUMNS)
 
         # Add scrollbar for details
         resupply_detail_scrollbar = ttk.Scrollbar(right_frame, orient='vertical', command=self.resupply_detail_tree.yview)
@@ -2050,93 +2390,32 @@ Version: 2.0
 
     def refresh_resupply_details(self):
         """Refresh the details view for the currently selected resupply order."""
-        # Clear existing details
-        self.resupply_detail_tree.delete(*self.resupply_detail_tree.get_children())
-
-        if not self.current_resupply_id:
-            return
-
         # Load and display details for the selected resupply order
-        for resupply in self.resupply_history:
-            if resupply.get('order_id') == self.current_resupply_id:
-                # Get all the resupply details
-                brand = resupply.get('brand', 'Unknown')
-                cigar_name = resupply.get('cigar', 'Unknown')
-                size = resupply.get('size', 'N/A')
-                cigar_type = resupply.get('type', 'N/A')
-                quantity = int(resupply.get('quantity', 1))
-                price = float(resupply.get('price', 0))
-                shipping_tax = float(resupply.get('shipping_tax', 0))
-                total_cost = float(resupply.get('total_cost', 0))
-                
-                values = (
-                    brand,
-                    cigar_name,
-                    size,
-                    cigar_type,
-                    str(quantity),
-                    f"${price:.2f}",
-                    f"${shipping_tax:.2f}",
-                    f"${total_cost:.2f}"
-                )
-                self.resupply_detail_tree.insert('', 'end', values=values)
+        rows = []
+        if self.current_resupply_id:
+            rows = [_resupply_detail_values(resupply) for resupply in self.resupply_history
+                    if resupply.get('order_id') == self.current_resupply_id]
+        _fill_tree(self.resupply_detail_tree, rows)
 
     def refresh_resupply_history(self):
         """Refresh the resupply history display with order grouping."""
-        # Clear current display
-        for item in self.resupply_tree.get_children():
-            self.resupply_tree.delete(item)
-            
         # Clear detail view if no order is selected
         if not hasattr(self, 'current_resupply_id') or not self.current_resupply_id:
-            for item in self.resupply_detail_tree.get_children():
-                self.resupply_detail_tree.delete(item)
-        
-        # Group resupply records by order_id
-        orders = {}
-        for resupply in self.resupply_history:
-            order_id = resupply.get('order_id', 'unknown')
-            if order_id not in orders:
-                orders[order_id] = []
-            orders[order_id].append(resupply)
-        
-        # Store order ID mapping for later retrieval
-        if not hasattr(self, 'resupply_id_map'):
-            self.resupply_id_map = {}
-        
-        # Display orders (newest first)
-        sorted_orders = sorted(
-            orders.items(), 
-            key=lambda x: x[1][0].get('date', ''), 
-            reverse=True
-        )
+            self.resupply_detail_tree.delete(*self.resupply_detail_tree.get_children())
         
-        for order_id, resupplies in sorted_orders:
+        # Format every order (newest first) before touching the tree
+        rows = []
+        order_ids = []
+        for order_id, resupplies in self._resupplies_by_order():
             try:
-                # Calculate order totals
-                total_items = sum(int(resupply.get('quantity', 1)) for resupply in resupplies)
-                total_cost = sum(float(resupply.get('total_cost', 0)) for resupply in resupplies)
-                total_shipping = sum(float(resupply.get('shipping_tax', 0)) for resupply in resupplies)
-                date = resupplies[0].get('date', 'Unknown')
-                
-                # Use the date from the first resupply in the order
-                date = resupplies[0].get('date', 'Unknown')
-                
-                # Create order summary
-                values = (
-                    date,
-                    str(total_items),
-                    f"${total_cost:.2f}",
-                    f"${total_shipping:.2f}"
-                )
-                
-                # Insert the item and store the order_id in our mapping
-                item_id = self.resupply_tree.insert('', 'end', values=values)
-                self.resupply_id_map[item_id] = order_id
-                
+                rows.append(_resupply_order_summary(resupplies))
+                order_ids.append(order_id)
             except Exception as e:
                 print(f"Error displaying resupply order {order_id}: {e}")
         
+        # Replace the rows in one batch and map each new row to its order_id
+        self.resupply_id_map = dict(zip(_fill_tree(self.resupply_tree, rows), order_ids))
+        
         # If we have a current order selected, refresh its details
         if hasattr(self, 'current_resupply_id') and self.current_resupply_id:
             self.refresh_resupply_details()
@@ -2197,8 +2476,7 @@ Version: 2.0
             if item:
                 item_set.add(item)
                 try:
-                    with open(self.get_data_file_path(filename), 'w') as f:
-                        json.dump(list(item_set), f, indent=2)
+                    self._dump_name_set(filename, item_set)
                     self.refresh_resupply_dropdowns()  # Refresh resupply dropdowns
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save {item_type.lower()}: {str(e)}")
@@ -2207,30 +2485,38 @@ Version: 2.0
         ttk.Button(dialog, text="Add", command=save_item).pack(pady=5)
         entry.bind('<Return>', lambda e: save_item())
 
-    def handle_click(self, event):
-        region = self.tree.identify_region(event.x, event.y)
-        if region != "cell":
-            return
+    def _click_target(self, event):
+        """Return (item, column id, column name) for a click on a cell, else None."""
+        # Bail out before any column parsing for headings, separators and empty space
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return None
             
-        column = self.tree.identify_column(event.x)
         item = self.tree.identify_row(event.y)
-        
         if not item:
-            return
+            return None
             
-        # Fix column number calculation - remove the '#' and convert to int
-        col_num = int(column.replace('#', '')) - 1
-        col_name = self.tree['columns'][col_num]
+        column = self.tree.identify_column(event.x)
+        col_name = self._col_by_id.get(column)
+        if col_name is None:
+            return None
+        return item, column, col_name
+
+    def handle_click(self, event):
+        target = self._click_target(event)
+        if not target:
+            return
+        item, column, col_name = target
         
         # Handle checkbox column click
         if column == '#1':  # First column (checkbox)
-            cigar_name = self.tree.item(item)['values'][2]  # Cigar name is now at index 2
+            cigar = self._cigar_for_row(item)
+            if not cigar:
+                return
+            cigar_name = cigar['cigar']
             self.checkbox_states[cigar_name] = not self.checkbox_states.get(cigar_name, False)
             
             # Update only the checkbox display for this specific row
-            current_values = list(self.tree.item(item)['values'])
-            current_values[0] = '☒' if self.checkbox_states[cigar_name] else '☐'
-            self.tree.item(item, values=current_values)
+            self.tree.set(item, 'select', '☒' if self.checkbox_states[cigar_name] else '☐')
             
             self.update_selected_cigars_display()  # Update the selected cigars display
             return
@@ -2238,92 +2524,158 @@ Version: 2.0
         # Don't clear other selections if Shift or Control is held
         if not (event.state & 0x4):  # Check if Control is held
             if not (event.state & 0x1):  # Check if Shift is held
-                self.tree.selection_set(item)
+                self.inventory_view.select(item)
         
         if col_name not in ['select', 'per_stick']:
-            x, y, w, h = self.tree.bbox(item, column)
-            
             # Clear any existing popups first
-            for widget in self.tree.winfo_children():
-                if isinstance(widget, ttk.Frame):
-                    widget.destroy()
+            self._close_popup()
+
+    def handle_double_click(self, event):
+        """Open the inline editor for the double-clicked cell."""
+        # The first click of the pair already ran handle_click; Tk routes the
+        # second press here only, so nothing is handled twice
+        target = self._click_target(event)
+        if not target:
+            return
+        item, column, col_name = target
+        
+        if column == '#1':
+            # A quick second click on a checkbox is still a toggle
+            self.handle_click(event)
+            return
+        if col_name in ['select', 'per_stick']:
+            return
             
-            # Only show editors on double-click
-            if hasattr(event, 'double') and event.double:
-                print(f"Double-click detected on column: {col_name}")
-                if col_name == 'brand':
-                    self.show_dropdown(item, col_name, self.brands, x, y, w, h)
-                elif col_name == 'size':
-                    self.show_dropdown(item, col_name, self.sizes, x, y, w, h)
-                elif col_name == 'type':
-                    self.show_dropdown(item, col_name, self.types, x, y, w, h)
-                elif col_name == 'personal_rating':
-                    print("Showing rating dropdown")
-                    self.show_rating_dropdown(item, col_name, x, y, w, h)
-                elif col_name == 'count':
-                    self.show_spinbox(item, col_name, x, y, w, h)
-                elif col_name in ['price', 'shipping']:
-                    self.show_price_entry(item, col_name, x, y, w, h)
-                else:  # cigar name field
-                    self.show_text_entry(item, col_name, x, y, w, h)
+        x, y, w, h = self.tree.bbox(item, column)
+        
+        # Clear any existing popups first
+        self._close_popup()
+        
+        print(f"Double-click detected on column: {col_name}")
+        if col_name == 'brand':
+            self.show_dropdown(item, col_name, self._sorted_choices('brands', blank=True), x, y, w, h)
+        elif col_name == 'size':
+            self.show_dropdown(item, col_name, self._sorted_choices('sizes', blank=True), x, y, w, h)
+        elif col_name == 'type':
+            self.show_dropdown(item, col_name, self._sorted_choices('types', blank=True), x, y, w, h)
+        elif col_name == 'personal_rating':
+            print("Showing rating dropdown")
+            self.show_rating_dropdown(item, col_name, x, y, w, h)
+        elif col_name == 'count':
+            self.show_spinbox(item, col_name, x, y, w, h)
+        elif col_name in ['price', 'shipping']:
+            self.show_price_entry(item, col_name, x, y, w, h)
+        else:  # cigar name field
+            self.show_text_entry(item, col_name, x, y, w, h)
+
+    def _build_popup_editors(self):
+        """Create the inline editor widgets once; each edit re-places them over a cell."""
+        self._popup_frame = ttk.Frame(self.tree)
+        self._popup_combo = ttk.Combobox(self._popup_frame)
+        self._popup_entry = ttk.Entry(self._popup_frame)
+        self._popup_spin = ttk.Spinbox(
+            self._popup_frame,
+            justify='center',
+            command=lambda: self._popup_event(manual_entry=False, should_close=False)
+        )
+        self._popup_commit = None
+        
+        # Bindings are made once and routed to the save callback of the open editor
+        self._popup_combo.bind('<<ComboboxSelected>>', self._popup_event)
+        self._popup_combo.bind('<Return>', self._popup_event)
+        self._popup_combo.bind('<FocusOut>', self._popup_event)
+        self._popup_entry.bind('<Return>', self._popup_event)
+        self._popup_entry.bind('<FocusOut>', self._popup_event)
+        self._popup_spin.bind('<Return>', lambda e: self._popup_event(e, manual_entry=True, should_close=True))
+        self._popup_spin.bind('<FocusOut>', lambda e: self._popup_event(e, manual_entry=False, should_close=True))
+        # Manual entry saves but doesn't close
+        self._popup_spin.bind('<KeyRelease>', lambda e: self._popup_event(e, manual_entry=True, should_close=False))
+        for widget in (self._popup_combo, self._popup_entry, self._popup_spin):
+            widget.bind('<Escape>', lambda e: self._close_popup())
+
+    def _popup_event(self, event=None, should_close=True, **kwargs):
+        """Forward an editor event to the save callback of the open editor."""
+        commit = self._popup_commit
+        if commit is None:
+            return
+        if should_close:
+            # Only one closing save per edit, even if a dialog steals focus mid-save
+            self._popup_commit = None
+            commit(event, **kwargs)
+        else:
+            commit(event, should_close=False, **kwargs)
+
+    def _open_popup(self, widget, commit, x, y, w, h):
+        """Show one of the shared editor widgets over a cell."""
+        self._close_popup()
+        for child in (self._popup_combo, self._popup_entry, self._popup_spin):
+            if child is not widget:
+                child.pack_forget()
+        widget.pack(expand=True, fill='both')
+        self._active_popup = widget
+        self._popup_commit = commit
+        self._popup_frame.place(x=x, y=y, width=w, height=h)
+        widget.focus()
+
+    def _close_popup(self):
+        """Hide the inline editor, if one is open."""
+        widget = self._active_popup
+        if widget is None:
+            return
+        self._active_popup = None
+        self._popup_commit = None
+        self._popup_frame.place_forget()
+        try:
+            focused = self.tree.focus_get()
+        except KeyError:  # Combobox popdown lists have no Python widget
+            focused = None
+        if focused is widget:
+            # A hidden widget keeps the keyboard focus; hand it back to the tree
+            self.tree.focus_set()
 
     def show_dropdown(self, item, column, values, x, y, w, h):
-        # Destroy any existing popups
-        for widget in self.tree.winfo_children():
-            if isinstance(widget, ttk.Frame):
-                widget.destroy()
-                
-        frame = ttk.Frame(self.tree)
-        
-        # Convert values to list if it's a range object
+        # Convert values to list if it's a range object; prepared lists
+        # from _sorted_choices already include the empty option
         if isinstance(values, range):
-            values = [str(i) for i in values]
-        else:
-            values = sorted(list(values))
-            
-        values = [''] + values  # Add empty option
+            values = [''] + [str(i) for i in values]
+        elif not isinstance(values, list):
+            values = [''] + sorted(values)
         
-        combo = ttk.Combobox(frame, values=values, width=w//10)
+        # Typing a new brand, size or type is allowed
+        combo = self._popup_combo
+        combo.configure(values=values, width=w//10, state='normal')
         current_value = self.tree.set(item, column)
         combo.set(current_value)
-        combo.pack(expand=True, fill='both')
         
         def save_value(event=None):
             try:
                 value = combo.get().strip()
                 
-                # Get all values from the tree item
-                item_values = self.tree.item(item)['values']
-                if not item_values:
+                # Find the cigar behind this row and update it
+                current_cigar = self._cigar_for_row(item)
+                if not current_cigar:
                     return
+                current_cigar_name = current_cigar['cigar']
                 
-                # Get cigar name (index 2 because of checkbox)
-                current_cigar_name = item_values[2]
-                current_brand = item_values[1]
+                # Update the value
+                current_cigar[column] = value
+                if column in ('brand', 'size'):
+                    self._reindex_cigar_identity(current_cigar)
                 
-                # Find the cigar in inventory and update it
-                current_cigar = None
-                for cigar in self.inventory:
-                    if cigar['cigar'] == current_cigar_name:
-                        current_cigar = cigar
-                        # Update the value
-                        cigar[column] = value
-                        
-                        # Add to appropriate set if not empty
-                        if value:
-                            if column == 'brand':
-                                self.brands.add(value)
-                                self.save_brands()
-                            elif column == 'size':
-                                self.sizes.add(value)
-                                self.save_sets('cigar_sizes.json', self.sizes)
-                            elif column == 'type':
-                                self.types.add(value)
-                                self.save_sets('cigar_types.json', self.types)
-                        break
+                # Add to appropriate set if not empty
+                if value:
+                    if column == 'brand':
+                        self.brands.add(value)
+                        self.save_brands()
+                    elif column == 'size':
+                        self.sizes.add(value)
+                        self.save_sets('cigar_sizes.json', self.sizes)
+                    elif column == 'type':
+                        self.types.add(value)
+                        self.save_sets('cigar_types.json', self.types)
                 
                 # Check for duplicates after updating brand
-                if current_cigar and column == 'brand':
+                if column == 'brand':
                     # Get the updated brand, cigar name, and size
                     updated_brand = current_cigar.get('brand', '')
                     updated_cigar_name = current_cigar.get('cigar', '')
@@ -2339,7 +2691,7 @@ Version: 2.0
                         return  # Don't continue with normal save process
                 
                 # Save changes
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 
                 # Update display
                 self.tree.set(item, column, value)
@@ -2347,40 +2699,31 @@ Version: 2.0
             except Exception as e:
                 print(f"Error saving value: {e}")
             finally:
-                frame.destroy()
-        
-        combo.bind('<<ComboboxSelected>>', save_value)
-        combo.bind('<Return>', save_value)
-        combo.bind('<FocusOut>', save_value)
-        combo.bind('<Escape>', lambda e: frame.destroy())
+                self._close_popup()
         
-        frame.place(x=x, y=y, width=w, height=h)
-        combo.focus()
+        self._open_popup(combo, save_value, x, y, w, h)
 
     def show_rating_dropdown(self, item, column, x, y, w, h):
         """Show a simple dropdown for ratings 1-10."""
         print("Entering show_rating_dropdown method")
         
-        # Get the cigar name and current rating
-        cigar_values = self.tree.item(item)['values']
-        if not cigar_values:
+        # Get the cigar and current rating
+        cigar = self._cigar_for_row(item)
+        if not cigar:
             print("No cigar values found")
             return
             
-        cigar_name = cigar_values[2]  # Index 2 for cigar name
+        cigar_name = cigar['cigar']
         current_rating = self.tree.set(item, column)
         print(f"Current rating: {current_rating}")
         
-        # Create frame and combobox
-        frame = ttk.Frame(self.tree)
-        
         # Create list of ratings 1-10
         ratings = [''] + [str(i) for i in range(1, 11)]
         
-        # Create and configure combobox
-        combo = ttk.Combobox(frame, values=ratings, width=w//10)
+        # Configure the shared combobox; ratings are pick-only
+        combo = self._popup_combo
+        combo.configure(values=ratings, width=w//10, state='readonly')
         combo.set(current_rating if current_rating != 'N/A' else '')
-        combo.pack(expand=True, fill='both')
         
         def save_rating(event=None):
             try:
@@ -2390,14 +2733,11 @@ Version: 2.0
                 print(f"Selected rating: {rating}")
                 
                 # Update inventory
-                for cigar in self.inventory:
-                    if cigar['cigar'] == cigar_name:
-                        cigar[column] = int(rating) if rating else None
-                        print(f"Updated rating for {cigar_name}: {cigar[column]}")
-                        break
+                cigar[column] = int(rating) if rating else None
+                print(f"Updated rating for {cigar_name}: {cigar[column]}")
                 
                 # Save to file
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 
                 # Update display
                 self.tree.set(item, column, rating if rating else 'N/A')
@@ -2405,25 +2745,16 @@ Version: 2.0
             except Exception as e:
                 print(f"Error saving rating: {e}")
             finally:
-                frame.destroy()
-        
-        # Bind events
-        combo.bind('<<ComboboxSelected>>', save_rating)
-        combo.bind('<Return>', save_rating)
-        combo.bind('<Escape>', lambda e: frame.destroy())
-        combo.bind('<FocusOut>', save_rating)
+                self._close_popup()
         
         # Position frame and focus
-        frame.place(x=x, y=y, width=w, height=h)
-        combo.focus()
+        self._open_popup(combo, save_rating, x, y, w, h)
         print("Rating dropdown setup complete")
 
     def show_spinbox(self, item, column, x, y, w, h):
         current_value = self.tree.set(item, column)
         if current_value == 'N/A':
             current_value = '0'
-            
-        frame = ttk.Frame(self.tree)
         
         # Configure spinbox based on column
         if column == 'count':
@@ -2433,161 +2764,119 @@ Version: 2.0
         else:  # overall_rating
             from_, to = 1, 100
             
-        spinbox = ttk.Spinbox(
-            frame,
-            from_=from_,
-            to=to,
-            width=w//10,
-            justify='center'
-        )
+        spinbox = self._popup_spin
+        spinbox.configure(from_=from_, to=to, width=w//10)
         spinbox.set(current_value)
-        spinbox.pack(expand=True, fill='both')
-        spinbox.focus()
 
-        def save_value(event=None, manual_entry=False, should_close=False):
+        def save_value(event=None, manual_entry=False, should_close=True):
             try:
                 value = int(spinbox.get())
                 
-                # Get all values from the tree item
-                item_values = self.tree.item(item)['values']
-                if not item_values:
-                    return
-                
-                # Get cigar name (index 2 because of checkbox)
-                cigar_name = item_values[2]
-                
-                # Find the cigar in inventory and update it
-                for cigar in self.inventory:
-                    if cigar['cigar'] == cigar_name:
-                        # Always update the count
-                        cigar[column] = value
-                        
-                        # Only recalculate price_per_stick if this was a manual entry (typing)
-                        if column == 'count' and manual_entry and value > 0:
-                            price = float(cigar.get('price', 0))
-                            shipping = float(cigar.get('shipping', 0))
-                            cigar['price_per_stick'] = self.calculate_price_per_stick(price, shipping, value)
-                            # Update the price_per_stick display in the tree
-                            self.tree.set(item, 'per_stick', f"${cigar['price_per_stick']:.2f}")
-                        break
+                # Find the cigar behind this row and update it
+                cigar = self._cigar_for_row(item)
+                if cigar:
+                    before = self._totals_contribution(cigar)
+                    # Always update the count
+                    cigar[column] = value
+                    
+                    # Only recalculate price_per_stick if this was a manual entry (typing)
+                    if column == 'count' and manual_entry and value > 0:
+                        price = float(cigar.get('price', 0))
+                        shipping = float(cigar.get('shipping', 0))
+                        cigar['price_per_stick'] = self.calculate_price_per_stick(price, shipping, value)
+                        # Update the price_per_stick display in the tree
+                        self.tree.set(item, 'per_stick', f"${cigar['price_per_stick']:.2f}")
                 
                 # Save changes
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 
                 # Update display and totals
                 self.tree.set(item, column, str(value))
-                self.update_inventory_totals()  # Update totals after count change
+                if cigar:
+                    # Update totals after count change
+                    self._adjust_inventory_totals(before, self._totals_contribution(cigar))
                 
             except ValueError:
                 # If invalid value, restore previous value
                 self.tree.set(item, column, current_value)
             finally:
                 if should_close:
-                    frame.destroy()
+                    self._close_popup()
 
-        # Create a command for spinbox arrows that saves without closing
-        def on_arrow():
-            save_value(manual_entry=False, should_close=False)
-        spinbox.configure(command=on_arrow)
-        
-        # Bind events that should save and close
-        spinbox.bind('<Return>', lambda e: save_value(e, manual_entry=True, should_close=True))
-        spinbox.bind('<FocusOut>', lambda e: save_value(e, manual_entry=False, should_close=True))
-        spinbox.bind('<Escape>', lambda e: frame.destroy())
-        
-        # Bind event for manual entry that saves but doesn't close
-        spinbox.bind('<KeyRelease>', lambda e: save_value(e, manual_entry=True, should_close=False))
-        
-        frame.place(x=x, y=y, width=w, height=h)
+        self._open_popup(spinbox, save_value, x, y, w, h)
 
     def show_price_entry(self, item, column, x, y, w, h):
         current_value = self.tree.set(item, column).replace('$', '')
         
-        frame = ttk.Frame(self.tree)
-        entry = ttk.Entry(frame, justify='right')
+        entry = self._popup_entry
+        entry.configure(justify='right')
+        entry.delete(0, tk.END)
         entry.insert(0, current_value)
-        entry.pack(expand=True, fill='both')
-        entry.focus()
         entry.select_range(0, tk.END)
 
         def save_value(event=None):
             try:
                 value = float(entry.get())
                 
-                # Get all values from the tree item
-                item_values = self.tree.item(item)['values']
-                if not item_values:
-                    return
-                
-                # Get cigar name (index 2 because of checkbox)
-                cigar_name = item_values[2]
-                
-                # Find the cigar in inventory and update it
-                for cigar in self.inventory:
-                    if cigar['cigar'] == cigar_name:
-                        cigar[column] = value
-                        # Recalculate price per stick only when price or shipping is manually changed
-                        if column in ['price', 'shipping'] and cigar['count'] > 0:
-                            cigar['price_per_stick'] = self.calculate_price_per_stick(
-                                cigar['price'],
-                                cigar['shipping'],
-                                cigar['count']
-                            )
-                        break
+                # Find the cigar behind this row and update it
+                cigar = self._cigar_for_row(item)
+                if cigar:
+                    before = self._totals_contribution(cigar)
+                    cigar[column] = value
+                    # Recalculate price per stick only when price or shipping is manually changed
+                    if column in ['price', 'shipping'] and cigar['count'] > 0:
+                        cigar['price_per_stick'] = self.calculate_price_per_stick(
+                            cigar['price'],
+                            cigar['shipping'],
+                            cigar['count']
+                        )
                 
                 # Save changes
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 
                 # Update display and totals
                 self.tree.set(item, column, f"${value:.2f}")
-                self.update_inventory_totals()  # Update totals after price change
+                if cigar:
+                    # Update totals after price change
+                    self._adjust_inventory_totals(before, self._totals_contribution(cigar))
                 
             except ValueError:
                 # If invalid value, restore previous value
                 self.tree.set(item, column, f"${float(current_value):.2f}")
             finally:
-                frame.destroy()
+                self._close_popup()
 
-        entry.bind('<Return>', save_value)
-        entry.bind('<FocusOut>', save_value)
-        entry.bind('<Escape>', lambda e: frame.destroy())
-        
-        frame.place(x=x, y=y, width=w, height=h)
+        self._open_popup(entry, save_value, x, y, w, h)
 
     def show_text_entry(self, item, column, x, y, w, h):
         current_value = self.tree.set(item, column)
         
-        frame = ttk.Frame(self.tree)
-        entry = ttk.Entry(frame)
+        entry = self._popup_entry
+        entry.configure(justify='left')
+        entry.delete(0, tk.END)
         entry.insert(0, current_value)
-        entry.pack(expand=True, fill='both')
-        entry.focus()
         entry.select_range(0, tk.END)
 
         def save_value(event=None):
             try:
                 value = entry.get().strip()
                 if value:  # Only save if there's a value
-                    # Get all values from the tree item
-                    item_values = self.tree.item(item)['values']
-                    if not item_values:
+                    # Find the cigar behind this row and update it
+                    current_cigar = self._cigar_for_row(item)
+                    if not current_cigar:
                         return
+                    current_cigar_name = current_cigar['cigar']
                     
-                    # Get cigar name (index 2 because of checkbox)
-                    current_cigar_name = item_values[2]
-                    current_brand = item_values[1]
-                    
-                    # Find the cigar in inventory and update it
-                    current_cigar = None
-                    for cigar in self.inventory:
-                        if cigar['cigar'] == current_cigar_name:
-                            current_cigar = cigar
-                            # Update the value
-                            cigar[column] = value
-                            break
+                    # Update the value, re-keying the index on a rename
+                    if column == 'cigar':
+                        self.rename_cigar(current_cigar, value)
+                    else:
+                        current_cigar[column] = value
+                        if column in ('brand', 'size'):
+                            self._reindex_cigar_identity(current_cigar)
                     
                     # Check for duplicates after updating brand, cigar name, or size
-                    if current_cigar and column in ['brand', 'cigar', 'size']:
+                    if column in ['brand', 'cigar', 'size']:
                         # Get the updated brand, cigar name, and size
                         updated_brand = current_cigar.get('brand', '')
                         updated_cigar_name = current_cigar.get('cigar', '')
@@ -2603,7 +2892,7 @@ Version: 2.0
                             return  # Don't continue with normal save process
                     
                     # Save changes
-                    self.save_inventory()
+                    self._mark_inventory_dirty()
                     
                     # Update display
                     self.tree.set(item, column, value)
@@ -2611,65 +2900,151 @@ Version: 2.0
             except Exception as e:
                 print(f"Error saving value: {e}")
             finally:
-                frame.destroy()
+                self._close_popup()
             
-        entry.bind('<Return>', save_value)
-        entry.bind('<FocusOut>', save_value)
-        entry.bind('<Escape>', lambda e: frame.destroy())
-        
-        frame.place(x=x, y=y, width=w, height=h)
+        self._open_popup(entry, save_value, x, y, w, h)
 
     def calculate_price_per_stick(self, price, shipping, count, original_quantity=None):
         """Calculate price per stick including tax and shipping."""
         try:
-            price = float(price)
-            shipping = float(shipping)
-            count = int(count)
-            
-            if count <= 0:
-                return 0
-                
-            # Calculate base price per stick
-            price_per_stick = price / count
-            
-            # Add tax to the base price
-            price_with_tax = price_per_stick * (1 + self.tax_rate)
-            
-            # If original_quantity is provided (new cigars), use it for shipping
-            # Otherwise (existing cigars), use current count
-            shipping_quantity = original_quantity if original_quantity is not None else count
-            shipping_per_stick = shipping / shipping_quantity
-            
-            # Total cost per stick
-            total_per_stick = price_with_tax + shipping_per_stick
-            
-            return total_per_stick
-            
-        except (ValueError, TypeError):
+            return _price_per_stick(price, shipping, count, original_quantity, self.tax_rate)
+        except TypeError:
+            # Unhashable input; nothing a real record holds, but keep the old contract
             return 0
         
+    def rebuild_inventory_index(self):
+        """Rebuild the cigar name -> inventory record lookup."""
+        index = {}
+        for cigar in self.inventory:
+            # Keep the first record for a name, matching the old linear scans
+            index.setdefault(cigar.get('cigar', ''), cigar)
+        self.inventory_by_name = index
+        self._indexed_inventory = self.inventory
+        self._dropped_names = set()
+
+    def find_cigar(self, cigar_name):
+        """Return the inventory record for a cigar name, or None if it is missing."""
+        if self._indexed_inventory is not self.inventory:
+            # The inventory list was replaced (load, sort, new humidor)
+            self.rebuild_inventory_index()
+        cigar = self.inventory_by_name.get(cigar_name)
+        if cigar is None:
+            # Appends are indexed as they happen, so a miss is a real miss unless
+            # the name's entry was dropped while another record may still carry it
+            if cigar_name not in self._dropped_names:
+                return None
+            self.rebuild_inventory_index()
+            cigar = self.inventory_by_name.get(cigar_name)
+        elif cigar.get('cigar') != cigar_name:
+            # The record was renamed outside the index; resync once
+            self.rebuild_inventory_index()
+            cigar = self.inventory_by_name.get(cigar_name)
+        return cigar
+
+    def rename_cigar(self, cigar, new_name):
+        """Rename a cigar and move its index entry and per-name UI state."""
+        old_name = cigar.get('cigar', '')
+        cigar['cigar'] = new_name
+        if old_name == new_name:
+            return
+        self._inventory_generation += 1
+        if self.inventory_by_name.get(old_name) is cigar:
+            del self.inventory_by_name[old_name]
+            self._dropped_names.add(old_name)
+        self.inventory_by_name.setdefault(new_name, cigar)
+        self._reindex_cigar_identity(cigar)
+        for states in (self.checkbox_states, self.stored_quantities):
+            if old_name in states:
+                states[new_name] = states.pop(old_name)
+
+    def _sorted_choices(self, name, blank=False):
+        """Sorted values of self.brands/sizes/types for dropdowns, re-sorted only when the set changes."""
+        values = getattr(self, name)
+        cached = self._sorted_cache.get(name)
+        # The sets are only ever added to or replaced, so size and identity catch every change
+        if cached is None or cached[0] is not values or cached[1] != len(values):
+            ordered = sorted(values)
+            cached = (values, len(values), ordered, [''] + ordered)
+            self._sorted_cache[name] = cached
+        return cached[3] if blank else cached[2]
+
+    def _cigar_name_choices(self, brand=None):
+        """Sorted cigar names for dropdowns, optionally one brand's, re-sorted only after inventory edits."""
+        # Every inventory edit is saved, so the save generation catches renames and brand changes
+        key = (len(self.inventory), self._inventory_generation)
+        cached = self._cigar_choices_cache
+        if cached is None or cached[0][0] is not self.inventory or cached[0][1:] != key:
+            names_by_brand = {}
+            for cigar in self.inventory:
+                name = cigar.get('cigar', '')
+                if name:
+                    names_by_brand.setdefault(cigar.get('brand', '').lower(), set()).add(name)
+            cached = ((self.inventory,) + key, sorted(set().union(*names_by_brand.values())), names_by_brand, {})
+            self._cigar_choices_cache = cached
+        if brand is None:
+            return cached[1]
+        brand = brand.lower()
+        sorted_by_brand = cached[3]
+        if brand not in sorted_by_brand:
+            sorted_by_brand[brand] = sorted(cached[2].get(brand, ()))
+        return sorted_by_brand[brand]
+
+    def _cigar_for_row(self, item):
+        """Return the inventory record shown in a tree row."""
+        cigar = self.inventory_view.record_by_iid.get(item)
+        if cigar is None:
+            # Row was not inserted by refresh_inventory; fall back to its name
+            values = self.tree.item(item)['values']
+            cigar = self.find_cigar(values[2]) if values else None
+        return cigar
+
+    def _index_cigar(self, cigar):
+        """Add a record just appended to the inventory to the name and identity indexes."""
+        self.inventory_by_name.setdefault(cigar.get('cigar', ''), cigar)
+        indexed, size, index, identities = self._identity_index_state
+        if indexed is self.inventory and size == len(self.inventory) - 1:
+            identity = identities[id(cigar)] = _cigar_identity(cigar)
+            index.setdefault(identity, []).append(cigar)
+            self._identity_index_state = (indexed, size + 1, index, identities)
+
+    def _unindex_cigar(self, cigar):
+        """Drop a removed record from the name index and invalidate the identity groups."""
+        name = cigar.get('cigar', '')
+        if self.inventory_by_name.get(name) is cigar:
+            del self.inventory_by_name[name]
+            self._dropped_names.add(name)
+        # Callers unindex before or after taking the record out of the list, so regroup
+        # on the next lookup; a removal is already a pass over the list
+        self._identity_index_state = (None, None, {}, {})
+
     def on_search(self, *args):
+        """Refresh once typing pauses instead of on every keystroke."""
+        if self._search_after_id:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(150, self._do_search)
+
+    def _do_search(self):
+        self._search_after_id = None
+        # Typing and deleting back to the rows already shown needs no refresh
+        if self.search_var.get().lower() == self._shown_search_term:
+            return
         self.refresh_inventory()
     
     def remove_selected(self):
-        selected_items = self.tree.selection()
-        if not selected_items:
+        # Rows scrolled out of a long list's window stay selected, so go by the records
+        selected_ids = self.inventory_view.selected_records()
+        if not selected_ids:
             messagebox.showwarning("Warning", "Please select items to remove")
             return
         
         # Get list of cigars to be removed with full details
         cigars_to_remove = []
-        for item in selected_items:
-            values = self.tree.item(item)['values']
-            if values:
-                brand = values[1]  # Index 1 for brand
-                cigar_name = values[2]  # Index 2 for cigar name
-                size = values[3]  # Index 3 for size
+        for cigar, _ in self.inventory_view.rows:
+            if id(cigar) in selected_ids:
                 cigars_to_remove.append({
-                    'brand': brand,
-                    'cigar': cigar_name,
-                    'size': size,
-                    'display_name': f"{brand} - {cigar_name} ({size})"
+                    'record': cigar,
+                    'cigar': cigar['cigar'],
+                    'display_name': f"{cigar['brand']} - {cigar['cigar']} ({cigar['size']})"
                 })
         
         # Confirm deletion with user
@@ -2677,35 +3052,28 @@ Version: 2.0
         confirm_msg += "\n".join([cigar['display_name'] for cigar in cigars_to_remove])
         if messagebox.askyesno("Confirm Removal", confirm_msg):
             # Remove from checkbox states if present
-            for cigar in cigars_to_remove:
-                cigar_key = cigar['cigar']
-                if cigar_key in self.checkbox_states:
-                    del self.checkbox_states[cigar_key]
+            for cigar_key in {cigar['cigar'] for cigar in cigars_to_remove} & self.checkbox_states.keys():
+                del self.checkbox_states[cigar_key]
                 
-            # Remove from inventory using brand, cigar, and size for precise matching
             removed_details = []
+            removed_ids = set()
             for cigar in cigars_to_remove:
-                # Find the cigar in inventory to get the count
-                for inv_cigar in self.inventory[:]:  # Use slice copy to avoid modification during iteration
-                    if (inv_cigar['brand'] == cigar['brand'] and 
-                        inv_cigar['cigar'] == cigar['cigar'] and 
-                        inv_cigar['size'] == cigar['size']):
-                        removed_details.append({
-                            'name': cigar['display_name'],
-                            'count': inv_cigar['count']
-                        })
-                        self.inventory.remove(inv_cigar)
-                        break
+                match = cigar['record']
+                removed_details.append({
+                    'name': cigar['display_name'],
+                    'count': match['count']
+                })
+                removed_ids.add(id(match))
+                self._unindex_cigar(match)
+            
+            # Drop all removed records in one pass
+            self.inventory[:] = [inv_cigar for inv_cigar in self.inventory if id(inv_cigar) not in removed_ids]
             
             # Save changes
-            self.save_inventory()
+            self._mark_inventory_dirty()
             
             # Refresh display
-            self.refresh_inventory()
-            
-            # Update totals
-            self.update_inventory_totals()
-            self.update_selected_cigars_display()
+            self.refresh_inventory(selection_changed=True)
             
             # Create detailed success message
             if len(removed_details) == 1:
@@ -2740,16 +3108,15 @@ Version: 2.0
                 if new_count < 0:
                     raise ValueError("Count cannot be negative")
                     
-                for cigar in self.inventory:
-                    if cigar['cigar'] == name:
-                        cigar['count'] = new_count
-                        # Update original_quantity to preserve cost basis
-                        cigar['original_quantity'] = new_count
-                        cigar['price_per_stick'] = self.calculate_price_per_stick(
-                            cigar['price'], cigar['shipping'], new_count, new_count)
-                        break
+                cigar = self.find_cigar(name)
+                if cigar:
+                    cigar['count'] = new_count
+                    # Update original_quantity to preserve cost basis
+                    cigar['original_quantity'] = new_count
+                    cigar['price_per_stick'] = self.calculate_price_per_stick(
+                        cigar['price'], cigar['shipping'], new_count, new_count)
                         
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 self.refresh_inventory()
                 dialog.destroy()
                 
@@ -2783,15 +3150,14 @@ Version: 2.0
                 if not (1 <= new_rating <= 10 if rating_type == 'personal' else 100):
                     raise ValueError(f"{rating_type.capitalize()} rating must be between 1 and 10" if rating_type == 'personal' else "Overall rating must be between 1 and 100")
                     
-                for cigar in self.inventory:
-                    if cigar['cigar'] == name:
-                        if rating_type == 'personal':
-                            cigar['personal_rating'] = new_rating
-                        else:
-                            cigar['overall_rating'] = new_rating
-                        break
+                cigar = self.find_cigar(name)
+                if cigar:
+                    if rating_type == 'personal':
+                        cigar['personal_rating'] = new_rating
+                    else:
+                        cigar['overall_rating'] = new_rating
                         
-                self.save_inventory()
+                self._mark_inventory_dirty()
                 self.refresh_inventory()
                 dialog.destroy()
                 
@@ -2800,104 +3166,212 @@ Version: 2.0
                 
         ttk.Button(dialog, text="Update", command=update).pack(pady=10)
         
-    def refresh_inventory(self):
+    def refresh_inventory(self, selection_changed=False):
+        """Redraw the inventory rows and totals; also rebuild the selected cigars panel if asked."""
         try:
-            # Store current selections by brand and cigar name
-            selected_items = []
-            for item in self.tree.selection():
-                values = self.tree.item(item)['values']
-                if values and len(values) >= 3:  # Make sure we have enough values
-                    selected_items.append((values[1], values[2]))  # brand, cigar
-            
-            # Clear current items
-            self.tree.delete(*self.tree.get_children())
+            # Store current selections by the records behind the rows
+            selected_items = self.inventory_view.selected_records()
             
             search_term = self.search_var.get().lower()
+            self._shown_search_term = search_term
+            # The text sort keys memoize each lowercased name, so reuse them for matching
+            name_lower = self._sort_key('cigar')
+            brand_lower = self._sort_key('brand')
             
             # Sort inventory if sort column is set
             if self.sort_column and self.sort_column != 'select':
-                def sort_key(x):
-                    value = x.get(self.sort_column, '')
-                    if self.sort_column == 'per_stick':
-                        return float(x.get('price_per_stick', 0))
-                    elif self.sort_column in ['count']:
-                        return int(value) if str(value).isdigit() else 0
-                    elif self.sort_column in ['price', 'shipping']:
-                        try:
-                            return float(str(value).replace('$', ''))
-                        except ValueError:
-                            return 0.0
-                    elif self.sort_column == 'personal_rating':
-                        return int(value) if value is not None else -1
-                    return str(value).lower()
-                
-                sorted_inventory = sorted(
-                    self.inventory,
-                    key=sort_key,
-                    reverse=self.sort_reverse.get(self.sort_column, False)
-                )
+                reverse = self.sort_reverse.get(self.sort_column, False)
+                if self._inventory_sorted_by == (id(self.inventory), self.sort_column, reverse):
+                    # sort_treeview already ordered the inventory itself; re-sorting in
+                    # place only fixes up rows edited since, in close to linear time
+                    self.inventory.sort(key=self._sort_key(self.sort_column), reverse=reverse)
+                    sorted_inventory = self.inventory
+                else:
+                    sorted_inventory = sorted(
+                        self.inventory,
+                        key=self._sort_key(self.sort_column),
+                        reverse=reverse
+                    )
             else:
                 # Sort by brand and cigar name by default
                 sorted_inventory = sorted(
                     self.inventory,
-                    key=lambda x: (x.get('brand', '').lower(), x.get('cigar', '').lower())
+                    key=lambda x: (brand_lower(x), name_lower(x))
                 )
             
-            # Display items
-            for cigar in sorted_inventory:
-                if search_term and search_term not in cigar.get('cigar', '').lower() and search_term not in cigar.get('brand', '').lower():
-                    continue
-                    
-                # Format rating properly
-                personal_rating = str(cigar.get('personal_rating')) if cigar.get('personal_rating') is not None else "N/A"
-                
-                # Get checkbox state
-                is_selected = self.checkbox_states.get(cigar.get('cigar', ''), False)
-                
-                # All inventory items now have original_quantity field
-                # Use original_quantity for shipping distribution to preserve cost basis
-                price_per_stick = self.calculate_price_per_stick(
-                    cigar.get('price', 0),
-                    cigar.get('shipping', 0),
-                    cigar.get('count', 0),
-                    cigar.get('original_quantity', cigar.get('count', 0))
-                )
-                
-                values = [
-                    '☒' if is_selected else '☐',
-                    cigar.get('brand', ''),
-                    cigar.get('cigar', ''),
-                    cigar.get('size', ''),
-                    cigar.get('type', ''),
-                    str(cigar.get('count', 0)),
-                    f"${cigar.get('price', 0):.2f}",
-                    f"${cigar.get('shipping', 0):.2f}",
-                    f"${price_per_stick:.2f}",
-                    personal_rating
-                ]
-                
-                item_id = self.tree.insert('', 'end', values=values)
-                
-                # Restore selection if this was a previously selected item
-                if (values[1], values[2]) in selected_items:
-                    self.tree.selection_add(item_id)
-                    self.tree.see(item_id)  # Make sure the item is visible
+            # Build every row up front, then apply only the differences to the tree
+            format_row = self._row_formatter()
+            rows = [(cigar, format_row(cigar)) for cigar in sorted_inventory
+                    if not search_term
+                    or search_term in name_lower(cigar)
+                    or search_term in brand_lower(cigar)]
+            
+            self.inventory_view.show(rows, selected_items)
             
-            # Update totals
-            self.update_order_total()
+            # Update totals; the selected cigars panel recomputes the order total itself
+            if selection_changed:
+                self.update_selected_cigars_display()
+            else:
+                self.update_order_total()
             self.update_inventory_totals()
                 
         except Exception as e:
             print(f"Error refreshing display: {str(e)}")
 
+    def update_inventory_rows(self, records, selection_changed=False):
+        """Redraw just these records' rows and the totals, after edits that can't move or filter them."""
+        if self.sort_column == 'count':
+            # Count changes can reorder the rows; lay them all out again
+            self.refresh_inventory(selection_changed)
+            return
+        try:
+            format_row = self._row_formatter(prune=False)
+            self.inventory_view.update_rows([(cigar, format_row(cigar)) for cigar in records if cigar])
+            
+            # Update totals; the selected cigars panel recomputes the order total itself
+            if selection_changed:
+                self.update_selected_cigars_display()
+            else:
+                self.update_order_total()
+            self.update_inventory_totals()
+        except Exception as e:
+            print(f"Error refreshing display: {str(e)}")
+
+    def _row_formatter(self, prune=True):
+        """Build a function that turns an inventory record into tree row values."""
+        # Look these up once per refresh rather than once per row
+        is_checked = self.checkbox_states.get
+        calculate_price_per_stick = self.calculate_price_per_stick
+        
+        # Formatted columns are reused while a record's fields are unchanged;
+        # records that are no longer displayed drop out of the cache
+        if self._row_cache_tax_rate != self.tax_rate:
+            self._row_cache = {}
+            self._row_cache_tax_rate = self.tax_rate
+        cache = self._row_cache
+        if prune:
+            fresh = self._row_cache = {}
+        else:
+            # Formatting a few rows must not evict the rest
+            fresh = cache
+        
+        def format_row(cigar):
+            get = cigar.get
+            source = (get('brand', ''), get('cigar', ''), get('size', ''), get('type', ''),
+                      get('count', 0), get('price', 0), get('shipping', 0),
+                      get('original_quantity'), get('personal_rating'))
+            cached = cache.get(id(cigar))
+            if cached is not None and cached[0] == source:
+                rows = cached[1]
+            else:
+                brand, name, size, cigar_type, count, price, shipping, original_quantity, rating = source
+                # All inventory items now have original_quantity field
+                # Use original_quantity for shipping distribution to preserve cost basis
+                price_per_stick = calculate_price_per_stick(
+                    price, shipping, count, count if original_quantity is None else original_quantity)
+                columns = (
+                    brand,
+                    name,
+                    size,
+                    cigar_type,
+                    str(count),
+                    f"${price:.2f}",
+                    f"${shipping:.2f}",
+                    f"${price_per_stick:.2f}",
+                    str(rating) if rating is not None else "N/A"
+                )
+                # Both checkbox variants are kept, so a refresh hands back the very
+                # same tuple and the tree diff can match it by identity
+                rows = (('☐',) + columns, ('☒',) + columns)
+            fresh[id(cigar)] = (source, rows)
+            return rows[1] if is_checked(source[1], False) else rows[0]
+        return format_row
+
+    def _mark_inventory_dirty(self):
+        """Schedule a single save for a burst of edits."""
+        self._dirty_inventory = True
+        self._inventory_generation += 1
+        if self._flush_after_id:
+            self.root.after_cancel(self._flush_after_id)
+        self._flush_after_id = self.root.after(500, self._flush_inventory)
+
+    def _flush_inventory(self, force=False):
+        """Write pending edits to disk now."""
+        if self._flush_after_id:
+            self.root.after_cancel(self._flush_after_id)
+            self._flush_after_id = None
+        if force or self._dirty_inventory:
+            self.save_inventory()
+
     def save_inventory(self):
+        # A full save covers any pending debounced edits
+        self._dirty_inventory = False
+        self._inventory_generation += 1
         try:
-            with open(self.get_data_file_path('cigar_inventory.json'), 'w') as f:
-                json.dump(self.inventory, f, indent=2)
+            self._write_data_file('inventory', 'cigar_inventory.json', self.inventory)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save inventory: {str(e)}")
             
+    def _write_data_file(self, what, filename, obj):
+        """Rewrite a data file, unless it would get the same bytes it was last saved with."""
+        path = self.get_data_file_path(filename)
+        data = _json_bytes(obj)
+        if self._written_files.get(path) == data:
+            return
+        self._write_in_background(what, _write_atomic, path, data)
+        self._written_files[path] = data
+            
+    def _write_in_background(self, what, write, path, data):
+        """Hand a serialized snapshot to the writer thread; failures are reported from the Tk thread."""
+        self._pending_writes.append((what, path, self._writer.submit(write, path, data)))
+        if self._write_check_id is None:
+            self._write_check_id = self.root.after(100, self._check_writes)
+
+    def _check_writes(self):
+        """Report background writes that failed, and keep checking while some are running."""
+        self._write_check_id = None
+        pending = []
+        for what, path, future in self._pending_writes:
+            if not future.done():
+                pending.append((what, path, future))
+            elif future.exception() is not None:
+                self._write_failed(what, path, future.exception())
+        self._pending_writes = pending
+        if pending:
+            self._write_check_id = self.root.after(100, self._check_writes)
+
+    def wait_for_writes(self):
+        """Block until queued writes are on disk; returns False if any of them failed."""
+        if self._write_check_id:
+            self.root.after_cancel(self._write_check_id)
+            self._write_check_id = None
+        pending, self._pending_writes = self._pending_writes, []
+        ok = True
+        for what, path, future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                self._write_failed(what, path, e)
+                ok = False
+        return ok
+
+    def _write_failed(self, what, path, error):
+        """Report a failed write and forget what the file was thought to hold, so the next save rewrites it."""
+        self._record_logs.pop(os.path.basename(path), None)
+        self._written_name_sets.pop(path, None)
+        self._written_files.pop(path, None)
+        messagebox.showerror("Error", f"Failed to save {what}: {str(error)}")
+            
     def load_inventory(self):
+        # Files still being written would otherwise be read half-finished
+        self.wait_for_writes()
+        # What is on disk now is what gets read, whoever wrote it
+        self._written_files.clear()
+        # Reads left over from a load that stopped early may predate those writes
+        self._prefetched.clear()
+        # Read the data files in the background while the history logs replay
+        self._prefetch_data_files(('humidor_settings.json', 'cigar_brands.json', 'cigar_sizes.json',
+                                   'cigar_types.json', 'cigar_inventory.json'))
         try:
             # Load sales and resupply history first
             self.load_sales_history()
@@ -2906,56 +3380,87 @@ Version: 2.0
             
             # Load brands first
             try:
-                with open(self.get_data_file_path('cigar_brands.json'), 'r') as f:
-                    self.brands = set(json.load(f))
+                self.brands = set(self._load_data_json('cigar_brands.json'))
             except FileNotFoundError:
                 self.brands = set()
             
             # Load sizes
             try:
-                with open(self.get_data_file_path('cigar_sizes.json'), 'r') as f:
-                    self.sizes = set(json.load(f))
+                self.sizes = set(self._load_data_json('cigar_sizes.json'))
             except FileNotFoundError:
                 self.sizes = set()
                 
             # Load types
             try:
-                with open(self.get_data_file_path('cigar_types.json'), 'r') as f:
-                    self.types = set(json.load(f))
+                self.types = set(self._load_data_json('cigar_types.json'))
             except FileNotFoundError:
                 self.types = set()
             
             # Load inventory
             try:
-                with open(self.get_data_file_path('cigar_inventory.json'), 'r') as f:
-                    self.inventory = json.load(f)
-                    # Add existing values to sets and ensure proper data structure
-                    for cigar in self.inventory:
-                        if 'brand' not in cigar: cigar['brand'] = ''
-                        if 'size' not in cigar: cigar['size'] = ''
-                        if 'type' not in cigar: cigar['type'] = ''
-                        if 'personal_rating' not in cigar: cigar['personal_rating'] = None
-                        
-                        if cigar['brand']: self.brands.add(cigar['brand'])
-                        if cigar['size']: self.sizes.add(cigar['size'])
-                        if cigar['type']: self.types.add(cigar['type'])
-                        
-                        # Only calculate price_per_stick if it doesn't exist
-                        if 'price_per_stick' not in cigar:
-                            cigar['price_per_stick'] = self.calculate_price_per_stick(
-                                cigar['price'], 
-                                cigar['shipping'], 
-                                cigar['count']
-                            )
-                        
-                        # Add original_quantity field for existing inventory to preserve cost basis
-                        if 'original_quantity' not in cigar:
-                            cigar['original_quantity'] = cigar.get('count', 0)
+                self.inventory = self._load_data_json('cigar_inventory.json')
+                # Add existing values to sets and ensure proper data structure
+                add_brand, add_size, add_type = self.brands.add, self.sizes.add, self.types.add
+                missing_price_per_stick = []
+                for cigar in self.inventory:
+                    brand = cigar.setdefault('brand', '')
+                    size = cigar.setdefault('size', '')
+                    cigar_type = cigar.setdefault('type', '')
+                    cigar.setdefault('personal_rating', None)
+                    
+                    if brand: add_brand(brand)
+                    if size: add_size(size)
+                    if cigar_type: add_type(cigar_type)
+                    
+                    # Store numbers as numbers once here so the sale and return
+                    # paths don't have to reparse them on every use
+                    count = cigar.get('count', 0)
+                    if type(count) is not int:
+                        cigar['count'] = _to_number(count, int, cigar)
+                    
+                    # Only calculate price_per_stick if it doesn't exist
+                    price_per_stick = cigar.get('price_per_stick')
+                    if price_per_stick is None and 'price_per_stick' not in cigar:
+                        missing_price_per_stick.append(cigar)
+                    elif type(price_per_stick) is not float:
+                        cigar['price_per_stick'] = _to_number(price_per_stick, float, cigar)
+                    
+                    # Add original_quantity field for existing inventory to preserve cost basis
+                    if 'original_quantity' not in cigar:
+                        cigar['original_quantity'] = cigar.get('count', 0)
+                
+                # Fill in missing prices in one batch with the tax rate bound once;
+                # one-off load values would only crowd out the edit-time cache
+                if missing_price_per_stick:
+                    compute = _price_per_stick.__wrapped__
+                    tax_rate = self.tax_rate
+                    for cigar in missing_price_per_stick:
+                        cigar['price_per_stick'] = compute(
+                            cigar['price'], cigar['shipping'], cigar['count'], None, tax_rate)
             except FileNotFoundError:
                 self.inventory = []
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load inventory: {str(e)}")
             self.inventory = []
+        finally:
+            # Anything not consumed (a loader bailed out early) is read afresh next time
+            self._prefetched.clear()
+        self.rebuild_inventory_index()
+
+    def _prefetch_data_files(self, filenames):
+        """Start loading data files on worker threads for _load_data_json to collect."""
+        for filename in filenames:
+            path = self.get_data_file_path(filename)
+            self._prefetched[path] = self._reader.submit(_load_json, path)
+
+    def _load_data_json(self, filename):
+        """Load a data file, using a prefetched read when one is pending."""
+        path = self.get_data_file_path(filename)
+        future = self._prefetched.pop(path, None)
+        if future is None:
+            return _load_json(path)
+        # Re-raises the worker's exception, e.g. FileNotFoundError, in the caller
+        return future.result()
 
     def export_inventory(self):
         if not self.inventory:
@@ -2980,21 +3485,26 @@ Version: 2.0
                     filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
                 )
                 if file_path:
-                    with open(file_path, 'w', newline='') as f:
-                        writer = csv.DictWriter(f, fieldnames=[
-                            'brand', 'cigar', 'size', 'type', 'count', 'price', 'shipping', 'price_per_stick',
-                            'personal_rating'
-                        ])
-                        writer.writeheader()
-                        writer.writerows(self.inventory)
+                    fieldnames = ['brand', 'cigar', 'size', 'type', 'count', 'price', 'shipping', 'price_per_stick',
+                                  'personal_rating']
+                    with open(file_path, 'w', newline='', buffering=1 << 20) as f:
+                        writer = csv.writer(f)
+                        writer.writerow(fieldnames)
+                        # Plain tuples, so extra record keys (original_quantity,
+                        # purchase_history) are simply left out
+                        writer.writerows(tuple(cigar.get(field, '') for field in fieldnames)
+                                         for cigar in self.inventory)
             else:
                 file_path = filedialog.asksaveasfilename(
                     defaultextension=".xlsx",
                     filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
                 )
                 if file_path:
-                    df = pd.DataFrame(self.inventory)
-                    df.to_excel(file_path, index=False)
+                    try:
+                        _write_xlsx(file_path, self.inventory)
+                    except ImportError:
+                        messagebox.showerror("Error", "Excel export needs the xlsxwriter or openpyxl package.")
+                        return
             
             dialog.destroy()
             messagebox.showinfo("Success", "Inventory exported successfully!")
@@ -3003,7 +3513,8 @@ Version: 2.0
 
     def on_closing(self):
         try:
-            self.save_inventory()
+            self._flush_inventory(force=True)
+            self.wait_for_writes()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save inventory: {str(e)}")
         finally:
@@ -3011,8 +3522,7 @@ Version: 2.0
 
     def save_brands(self):
         try:
-            with open(self.get_data_file_path('cigar_brands.json'), 'w') as f:
-                json.dump(list(self.brands), f, indent=2)
+            self._dump_name_set('cigar_brands.json', self.brands)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save brands: {str(e)}")
 
@@ -3040,13 +3550,15 @@ Version: 2.0
         )
         
         self.inventory.append(new_cigar)
-        self.save_inventory()
+        self._index_cigar(new_cigar)
+        self._mark_inventory_dirty()
         self.refresh_inventory()
         
         # Select the new item
-        last_item = self.tree.get_children()[-1]
-        self.tree.selection_add(last_item)  # Changed from selection_set to selection_add
-        self.tree.see(last_item)
+        new_item = self.inventory_view.reveal(new_cigar)
+        if new_item:
+            self.inventory_view.select(new_item, extend=True)
+            self.tree.see(new_item)
 
     def resupply_order(self):
         """Create a resupply order window for adding multiple cigars from one order."""
@@ -3170,13 +3682,13 @@ Version: 2.0
             
             # Show appropriate editor
             if col_name == 'brand':
-                show_resupply_dropdown(item, item_index, col_name, sorted(list(self.brands)), x, y, w, h)
+                show_resupply_dropdown(item, item_index, col_name, self._sorted_choices('brands', blank=True), x, y, w, h)
             elif col_name == 'cigar':
                 show_resupply_cigar_dropdown(item, item_index, col_name, x, y, w, h)
             elif col_name == 'size':
-                show_resupply_dropdown(item, item_index, col_name, sorted(list(self.sizes)), x, y, w, h)
+                show_resupply_dropdown(item, item_index, col_name, self._sorted_choices('sizes', blank=True), x, y, w, h)
             elif col_name == 'type':
-                show_resupply_dropdown(item, item_index, col_name, sorted(list(self.types)), x, y, w, h)
+                show_resupply_dropdown(item, item_index, col_name, self._sorted_choices('types', blank=True), x, y, w, h)
             elif col_name == 'count':
                 show_resupply_spinbox(item, item_index, col_name, x, y, w, h)
             elif col_name == 'price':
@@ -3192,8 +3704,6 @@ Version: 2.0
                     
             frame = ttk.Frame(cigars_tree)
             
-            values = [''] + values  # Add empty option
-            
             combo = ttk.Combobox(frame, values=values, width=w//10)
             current_value = order_cigars[item_index].get(column, '')
             combo.set(current_value)
@@ -3243,14 +3753,11 @@ Version: 2.0
             # Get existing cigar names for dropdown
             if current_brand:
                 # Filter cigars by selected brand (case-insensitive)
-                filtered_cigars = sorted(list(set(
-                    cigar.get('cigar', '') for cigar in self.inventory 
-                    if cigar.get('cigar', '') and cigar.get('brand', '').lower() == current_brand.lower()
-                )))
+                filtered_cigars = self._cigar_name_choices(current_brand)
                 cigar_values = [''] + filtered_cigars
             else:
                 # Show all cigars if no brand selected
-                existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
+                existing_cigars = self._cigar_name_choices()
                 cigar_values = [''] + existing_cigars
             
             combo = ttk.Combobox(frame, values=cigar_values, width=w//10)
@@ -3403,14 +3910,14 @@ Version: 2.0
         ttk.Label(input_frame, text="Brand:").grid(row=row, column=0, sticky='w', padx=(0, 5), pady=(0, 2))
         brand_var = tk.StringVar()
         brand_combo = ttk.Combobox(input_frame, textvariable=brand_var, 
-                                   values=sorted(list(self.brands)), width=20)
+                                   values=self._sorted_choices('brands'), width=20)
         brand_combo.grid(row=row, column=1, padx=(0, 10), pady=(0, 2), sticky='ew')
         row += 1
         
         ttk.Label(input_frame, text="Cigar:").grid(row=row, column=0, sticky='w', padx=(0, 5), pady=(0, 2))
         cigar_var = tk.StringVar()
         # Get existing cigar names for dropdown
-        existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
+        existing_cigars = self._cigar_name_choices()
         cigar_combo = ttk.Combobox(input_frame, textvariable=cigar_var, 
                                    values=existing_cigars, width=20)
         cigar_combo.grid(row=row, column=1, padx=(0, 10), pady=(0, 2), sticky='ew')
@@ -3421,10 +3928,7 @@ Version: 2.0
             selected_brand = brand_var.get().strip()
             if selected_brand:
                 # Filter cigars by selected brand (case-insensitive)
-                filtered_cigars = sorted(list(set(
-                    cigar.get('cigar', '') for cigar in self.inventory 
-                    if cigar.get('cigar', '') and cigar.get('brand', '').lower() == selected_brand.lower()
-                )))
+                filtered_cigars = self._cigar_name_choices(selected_brand)
                 cigar_combo.config(values=filtered_cigars)
                 # Clear current selection if it doesn't match the brand
                 current_cigar = cigar_var.get()
@@ -3443,14 +3947,14 @@ Version: 2.0
         ttk.Label(input_frame, text="Size:").grid(row=row, column=0, sticky='w', padx=(0, 5), pady=(0, 2))
         size_var = tk.StringVar()
         size_combo = ttk.Combobox(input_frame, textvariable=size_var, 
-                                  values=sorted(list(self.sizes)), width=20)
+                                  values=self._sorted_choices('sizes'), width=20)
         size_combo.grid(row=row, column=1, padx=(0, 10), pady=(0, 2), sticky='ew')
         row += 1
         
         ttk.Label(input_frame, text="Type:").grid(row=row, column=0, sticky='w', padx=(0, 5), pady=(0, 2))
         type_var = tk.StringVar()
         type_combo = ttk.Combobox(input_frame, textvariable=type_var, 
-                                  values=sorted(list(self.types)), width=20)
+                                  values=self._sorted_choices('types'), width=20)
         type_combo.grid(row=row, column=1, padx=(0, 10), pady=(0, 2), sticky='ew')
         row += 1
         
@@ -3506,42 +4010,7 @@ Version: 2.0
                 # Update the humidor's tax rate
                 self.tax_rate = tax_rate
                 
-                # Calculate total cigars and base prices
-                total_cigars = sum(cigar['count'] for cigar in order_cigars)
-                
-                if total_cigars == 0:
-                    # Clear all proportional costs if no cigars
-                    for cigar in order_cigars:
-                        cigar['proportional_shipping'] = 0
-                        cigar['proportional_tax'] = 0
-                        cigar['price_per_stick'] = 0
-                    total_tax_label.config(text="$0.00")
-                    refresh_cigars_display()
-                    return
-                
-                # Calculate total tax based on base prices and tax rate
-                total_tax_amount = 0
-                shipping_per_cigar = total_shipping / total_cigars
-                
-                # Update each cigar with proportional costs
-                for cigar in order_cigars:
-                    cigar_count = cigar['count']
-                    base_price = cigar['price']
-                    
-                    # Calculate proportional shipping
-                    cigar['proportional_shipping'] = shipping_per_cigar * cigar_count
-                    
-                    # Calculate tax based on base price and tax rate
-                    base_price_per_stick = base_price / cigar_count if cigar_count > 0 else 0
-                    tax_per_stick = base_price_per_stick * tax_rate
-                    cigar['proportional_tax'] = tax_per_stick * cigar_count
-                    
-                    # Add to total tax amount
-                    total_tax_amount += cigar['proportional_tax']
-                    
-                    # Calculate price per stick (base price + tax + proportional shipping) / count
-                    total_cost = base_price + cigar['proportional_tax'] + cigar['proportional_shipping']
-                    cigar['price_per_stick'] = total_cost / cigar_count if cigar_count > 0 else 0
+                total_tax_amount = _allocate_resupply_costs(order_cigars, total_shipping, tax_rate)
                 
                 # Update total tax display
                 total_tax_label.config(text=f"${total_tax_amount:.2f}")
@@ -3560,24 +4029,7 @@ Version: 2.0
         
         def refresh_cigars_display():
             """Refresh the cigars treeview display."""
-            # Clear existing items
-            for item in cigars_tree.get_children():
-                cigars_tree.delete(item)
-            
-            # Add all cigars
-            for cigar in order_cigars:
-                values = (
-                    cigar.get('brand', ''),
-                    cigar.get('cigar', ''),
-                    cigar.get('size', ''),
-                    cigar.get('type', ''),
-                    str(cigar.get('count', 0)),
-                    f"${cigar.get('price', 0):.2f}",
-                    f"${cigar.get('proportional_shipping', 0):.2f}",
-                    f"${cigar.get('proportional_tax', 0):.2f}",
-                    f"${cigar.get('price_per_stick', 0):.2f}"
-                )
-                cigars_tree.insert('', 'end', values=values)
+            _fill_tree(cigars_tree, [_resupply_cigar_values(cigar) for cigar in order_cigars])
         
         def add_cigar():
             """Add a cigar to the order."""
@@ -3687,9 +4139,32 @@ Version: 2.0
             original_calculate()
             update_summary()
         
-        # Bind calculation updates to total fields
-        total_shipping_var.trace('w', lambda *args: calculate_proportional_costs())
-        tax_rate_var.trace('w', lambda *args: calculate_proportional_costs())
+        # Recalculate once typing in the total fields pauses, not on every keystroke
+        costs_after_id = None
+        
+        def on_cost_change(*args):
+            nonlocal costs_after_id
+            if costs_after_id:
+                dialog.after_cancel(costs_after_id)
+            costs_after_id = dialog.after(80, flush_costs)
+        
+        def flush_costs():
+            nonlocal costs_after_id
+            if costs_after_id:
+                dialog.after_cancel(costs_after_id)
+                costs_after_id = None
+                calculate_proportional_costs()
+        
+        def cancel_costs(event):
+            # Closing the dialog mid-typing must not leave the update to run on dead widgets
+            nonlocal costs_after_id
+            if event.widget is dialog and costs_after_id:
+                dialog.after_cancel(costs_after_id)
+                costs_after_id = None
+        
+        dialog.bind('<Destroy>', cancel_costs, add='+')
+        total_shipping_var.trace('w', on_cost_change)
+        tax_rate_var.trace('w', on_cost_change)
         
         def process_order():
             """Process the entire order and add to inventory."""
@@ -3697,6 +4172,9 @@ Version: 2.0
                 messagebox.showwarning("Warning", "Please add at least one cigar to the order.")
                 return
             
+            # Costs typed in just before clicking may not have been applied yet
+            flush_costs()
+            
             try:
                 added_count = 0
                 combined_details = []
@@ -3770,6 +4248,7 @@ Version: 2.0
                         }
                         
                         self.inventory.append(new_cigar)
+                        self._index_cigar(new_cigar)
                         added_count += 1
                 
                 # Save all changes
@@ -3783,7 +4262,6 @@ Version: 2.0
                 # Refresh displays
                 self.refresh_inventory()
                 self.refresh_resupply_history()
-                self.update_inventory_totals()
                 
                 dialog.destroy()
                 
@@ -3821,22 +4299,57 @@ Version: 2.0
         # Focus on first field
         total_shipping_entry.focus()
 
+    def _inventory_by_identity(self):
+        """Inventory records grouped by lowercased (brand, cigar, size).
+        
+        Appends and edits move single records (_index_cigar, _reindex_cigar_identity). A replaced
+        list, or a removal through _unindex_cigar, regroups everything on the next lookup; the
+        size check only catches appends made without _index_cigar.
+        """
+        indexed, size, index, identities = self._identity_index_state
+        if indexed is not self.inventory or size != len(self.inventory):
+            index = {}
+            identities = {}
+            for cigar in self.inventory:
+                identity = identities[id(cigar)] = _cigar_identity(cigar)
+                index.setdefault(identity, []).append(cigar)
+            self._identity_index_state = (self.inventory, len(self.inventory), index, identities)
+        return index
+    
+    def _reindex_cigar_identity(self, cigar):
+        """Move an edited record to the group for its current brand, name and size."""
+        indexed, size, index, identities = self._identity_index_state
+        if indexed is not self.inventory or size != len(self.inventory):
+            return  # The next lookup regroups everything anyway
+        identity = _cigar_identity(cigar)
+        old_identity = identities.get(id(cigar))
+        if old_identity == identity:
+            return
+        if old_identity is not None:
+            # Match by identity; == would compare the dicts' contents
+            group = [other for other in index[old_identity] if other is not cigar]
+            if group:
+                index[old_identity] = group
+            else:
+                del index[old_identity]
+        index.setdefault(identity, []).append(cigar)
+        identities[id(cigar)] = identity
+
     def check_for_duplicate_cigar(self, brand, cigar_name, size):
         """Check if a cigar with the same brand, name, and size already exists."""
-        for existing_cigar in self.inventory:
-            if (existing_cigar.get('brand', '').lower() == brand.lower() and 
-                existing_cigar.get('cigar', '').lower() == cigar_name.lower() and
-                existing_cigar.get('size', '').lower() == size.lower()):
+        identity = (brand.lower(), cigar_name.lower(), size.lower())
+        for existing_cigar in self._inventory_by_identity().get(identity, ()):
+            # An edit in progress may not be indexed yet, so confirm the match
+            if _cigar_identity(existing_cigar) == identity:
                 return existing_cigar
         return None
 
     def check_for_duplicate_cigar_excluding_current(self, brand, cigar_name, size, current_cigar_name):
         """Check if a cigar with the same brand, name, and size already exists, excluding the current one being edited."""
-        for existing_cigar in self.inventory:
+        identity = (brand.lower(), cigar_name.lower(), size.lower())
+        for existing_cigar in self._inventory_by_identity().get(identity, ()):
             if (existing_cigar.get('cigar', '') != current_cigar_name and
-                existing_cigar.get('brand', '').lower() == brand.lower() and 
-                existing_cigar.get('cigar', '').lower() == cigar_name.lower() and
-                existing_cigar.get('size', '').lower() == size.lower()):
+                _cigar_identity(existing_cigar) == identity):
                 return existing_cigar
         return None
 
@@ -3857,15 +4370,17 @@ Version: 2.0
             
             # Remove the current (empty) cigar
             self.inventory.remove(current_cigar)
+            self._unindex_cigar(current_cigar)
             
             # Update the duplicate cigar's name if needed
             if duplicate_cigar.get('brand', '') != brand:
                 duplicate_cigar['brand'] = brand
+                self._reindex_cigar_identity(duplicate_cigar)
             if duplicate_cigar.get('cigar', '') != cigar_name:
-                duplicate_cigar['cigar'] = cigar_name
+                self.rename_cigar(duplicate_cigar, cigar_name)
                 
             # Save and refresh
-            self.save_inventory()
+            self._mark_inventory_dirty()
             self.refresh_inventory()
             messagebox.showinfo("Merged", f"Merged with existing cigar: {brand} - {cigar_name}")
             return
@@ -3877,23 +4392,24 @@ Version: 2.0
             # Combine the cigars
             self.combine_cigar_purchases(duplicate_cigar, current_count, current_price, current_shipping)
             
-            # Remove the current cigar since it's been combined
+            # Remove the current cigar since it's been combined, and its check mark with it
             self.inventory.remove(current_cigar)
+            self._unindex_cigar(current_cigar)
+            self.checkbox_states.pop(current_cigar.get('cigar', ''), None)
             
             # Save and refresh
-            self.save_inventory()
+            self._mark_inventory_dirty()
             self.refresh_inventory()
-            self.update_inventory_totals()
             
             messagebox.showinfo("Combined", "Cigars have been combined successfully!")
             
         elif result == "separate":
             # Keep them separate - restore the original names to avoid confusion
             # We need to modify the names to make them unique
-            current_cigar['cigar'] = current_cigar['cigar'] + " (2)"
+            self.rename_cigar(current_cigar, current_cigar['cigar'] + " (2)")
             
             # Save and refresh
-            self.save_inventory()
+            self._mark_inventory_dirty()
             self.refresh_inventory()
             
             messagebox.showinfo("Kept Separate", "Cigars kept as separate entries. Added '(2)' to distinguish them.")
@@ -4052,85 +4568,77 @@ Version: 2.0
             existing_cigar['price_per_stick'] = self.calculate_price_per_stick(new_price, new_shipping, new_count)
             existing_cigar['original_quantity'] = new_count  # Set original quantity for cost basis
 
+    def _sort_key(self, col):
+        """Key function that orders inventory records by a tree column."""
+        if col == 'per_stick':
+            col = 'price_per_stick'
+        # Keys parsed from strings are kept per column across sorts and refreshes
+        parsed = self._sort_key_cache.setdefault(col, {})
+        if col in ('count', 'personal_rating', 'price', 'shipping', 'price_per_stick'):
+            fallback = -1 if col in ('count', 'personal_rating') else 0.0
+            def key(item):
+                value = item.get(col, '0')
+                if type(value) in (int, float):
+                    return float(value)
+                try:
+                    return parsed[value]
+                except (KeyError, TypeError):
+                    pass
+                try:
+                    result = float(str(value).replace('$', '').replace(',', '').replace('N/A', '-1'))
+                except ValueError:
+                    result = fallback
+                if isinstance(value, str):
+                    parsed[value] = result
+                return result
+            return key
+        def key(item):
+            value = item.get(col, '')
+            if type(value) is not str:
+                return str(value).lower()
+            try:
+                return parsed[value]
+            except KeyError:
+                result = parsed[value] = value.lower()
+                return result
+        return key
+
     def sort_treeview(self, col):
         """Sort treeview by column."""
         if col == 'select':  # Don't sort the checkbox column
             return
         
         try:
-            # Store current selections by brand and cigar name
-            selected_items = []
-            for item in self.tree.selection():
-                values = self.tree.item(item)['values']
-                if values:
-                    selected_items.append((values[1], values[2]))  # brand, cigar
-            
             # Toggle sort direction
             if not hasattr(self, 'sort_reverse'):
                 self.sort_reverse = {}
             self.sort_reverse[col] = not self.sort_reverse.get(col, False)
-            
-            # Create a list of tuples (sort_key, original_item)
-            items_to_sort = []
-            for item in self.inventory:
-                if col == 'per_stick':
-                    # Handle price_per_stick sorting
-                    try:
-                        key = float(str(item.get('price_per_stick', '0')).replace('$', '').replace(',', ''))
-                    except ValueError:
-                        key = 0.0
-                elif col in ['count', 'personal_rating']:
-                    try:
-                        key = float(str(item.get(col, '0')).replace('N/A', '-1'))
-                    except ValueError:
-                        key = -1
-                elif col in ['price', 'shipping']:
-                    try:
-                        key = float(str(item.get(col, '0')).replace('$', '').replace(',', ''))
-                    except ValueError:
-                        key = 0.0
-                else:
-                    key = str(item.get(col, '')).lower()
-                
-                items_to_sort.append((key, item))
-            
-            # Sort the items
-            items_to_sort.sort(key=lambda x: x[0], reverse=self.sort_reverse[col])
-            
-            # Update inventory with sorted items
-            self.inventory = [item[1] for item in items_to_sort]
-            
-            # Clear and repopulate the tree
-            self.tree.delete(*self.tree.get_children())
-            
-            # Repopulate with sorted data
-            for item in self.inventory:
-                values = [
-                    '☒' if self.checkbox_states.get(item.get('cigar', ''), False) else '☐',
-                    item.get('brand', ''),
-                    item.get('cigar', ''),
-                    item.get('size', ''),
-                    item.get('type', ''),
-                    str(item.get('count', '0')),
-                    f"${float(item.get('price', '0')):.2f}",
-                    f"${float(item.get('shipping', '0')):.2f}",
-                    f"${float(item.get('price_per_stick', '0')):.2f}",
-                    item.get('personal_rating', 'N/A')
-                ]
-                
-                iid = self.tree.insert('', 'end', values=values)
-                
-                # Restore selection if this was previously selected
-                if (values[1], values[2]) in selected_items:
-                    self.tree.selection_add(iid)
-                    self.tree.see(iid)
+            reverse = self.sort_reverse[col]
+            self.sort_column = col
+            
+            # Extract each record's key once into a list parallel to the inventory, sort
+            # the index permutation by plain list lookups and apply it in place
+            inventory = self.inventory
+            keys = list(map(self._sort_key(col), inventory))
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+            inventory[:] = [inventory[i] for i in order]
+            self._inventory_sorted_by = (id(inventory), col, reverse)
+            
+            # Reorder the rows already formatted for display rather than rebuilding them
+            try:
+                rank = {id(item): position for position, item in enumerate(inventory)}
+                self.inventory_view.rows.sort(key=lambda row: rank[id(row[0])])
+            except KeyError:
+                # Rows predate an inventory swap; build them afresh
+                self.refresh_inventory(selection_changed=True)
+            else:
+                self.inventory_view.show(self.inventory_view.rows)
+                # Reordering leaves the inventory totals as they are; the selected
+                # cigars panel follows inventory order
+                self.update_selected_cigars_display()
             
             # Update column header
-            self.tree.heading(col, text=f"{col.title()} {'↓' if self.sort_reverse[col] else '↑'}")
-            
-            # Update displays
-            self.update_inventory_totals()
-            self.update_selected_cigars_display()
+            self.tree.heading(col, text=f"{col.title()} {'↓' if reverse else '↑'}")
             
         except Exception as e:
             print(f"Sort error: {str(e)}")
@@ -4138,11 +4646,21 @@ Version: 2.0
     def save_sets(self, filename, data_set):
         """Save a set to a JSON file."""
         try:
-            with open(self.get_data_file_path(filename), 'w') as f:
-                json.dump(list(data_set), f, indent=2)
+            self._dump_name_set(filename, data_set)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save {filename}: {str(e)}")
 
+    def _dump_name_set(self, filename, names):
+        """Write a brand, size or type set unless it matches what was last written there."""
+        path = self.get_data_file_path(filename)
+        snapshot = frozenset(names)
+        if self._written_name_sets.get(path) == snapshot:
+            return
+        # Sorted so the file only changes when its contents do
+        self._write_in_background(_data_file_title(path), _write_atomic,
+                                  path, _json_bytes(sorted(snapshot, key=str)))
+        self._written_name_sets[path] = snapshot
+
     def setup_sales_frame(self, parent_frame):
         # Sale frame
         order_frame = ttk.LabelFrame(parent_frame, text="Sale", padding=10)
@@ -4152,52 +4670,45 @@ Version: 2.0
         pack_container = ttk.Frame(order_frame)
         pack_container.pack(fill='both', expand=True)
 
-        # Create scrollable frame for selected cigars
-        pack_canvas = tk.Canvas(pack_container)
+        # Scrollable list of selected cigars; only the rows in view get widgets
+        pack_canvas = tk.Canvas(pack_container, highlightthickness=0)
         pack_scrollbar = ttk.Scrollbar(pack_container, orient="vertical", command=pack_canvas.yview)
+        self._selected_canvas = pack_canvas
         
-        # Create a frame to hold both the cigars list and the totals
-        self.selected_cigars_frame = ttk.Frame(pack_canvas)
-
-        # Configure canvas
-        pack_canvas.configure(yscrollcommand=pack_scrollbar.set)
+        # Configure canvas; every view change re-places the pooled rows
+        def on_pack_yscroll(first, last):
+            pack_scrollbar.set(first, last)
+            self._render_selected_rows()
+        pack_canvas.configure(yscrollcommand=on_pack_yscroll)
         
         # Pack scrollbar and canvas
         pack_scrollbar.pack(side="right", fill="y")
         pack_canvas.pack(side="left", fill="both", expand=True)
-        
-        # Create window in canvas for the frame
-        canvas_frame = pack_canvas.create_window((0, 0), window=self.selected_cigars_frame, anchor="nw", width=pack_canvas.winfo_reqwidth())
-
-        # Configure canvas scrolling
-        def configure_scroll_region(event):
-            pack_canvas.configure(scrollregion=pack_canvas.bbox("all"))
-            # Update the window width when frame changes
-            pack_canvas.itemconfig(canvas_frame, width=pack_canvas.winfo_width())
-            
-        self.selected_cigars_frame.bind("<Configure>", configure_scroll_region)
-        pack_canvas.bind('<Configure>', lambda e: pack_canvas.itemconfig(canvas_frame, width=e.width))
+        pack_canvas.bind('<Configure>', lambda e: self._render_selected_rows(force=True))
 
         # Add mouse wheel scrolling for pack list
         def on_pack_mousewheel(event):
             pack_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
         pack_canvas.bind('<MouseWheel>', on_pack_mousewheel)
-        self.selected_cigars_frame.bind('<MouseWheel>', lambda e: pack_canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
 
         # Set fixed height for pack list
-        pack_canvas.configure(height=300)  # Increased height to accommodate totals
+        pack_canvas.configure(height=200)
 
-        # Dictionary to store quantity spinboxes
-        self.quantity_spinboxes = {}
+        # Quantity per selected cigar; pooled rows attach their spinbox to these
+        self.quantity_vars = {}
+        self._selected_cigars = []  # Selected records, in display order
+        self._selected_cigar_rows = []  # Pooled row widgets for the rows in view
+        self._selected_row_height = None  # Measured from the first pooled row
+        self._selected_first = None  # First selected cigar shown by the pool
 
-        # Create frame for total labels and sell button at the bottom of the scrollable area
-        self.totals_frame = ttk.Frame(self.selected_cigars_frame)
+        # Create frame for total labels and sell button below the list
+        self.totals_frame = ttk.Frame(order_frame)
         
         # Add separator above totals
-        ttk.Separator(self.selected_cigars_frame, orient='horizontal').pack(fill='x', pady=10)
+        ttk.Separator(order_frame, orient='horizontal').pack(fill='x', pady=10)
         
         # Pack the totals frame at the bottom
-        self.totals_frame.pack(fill='x', pady=5, side='bottom')
+        self.totals_frame.pack(fill='x', pady=5)
 
         self.order_total_label = ttk.Label(self.totals_frame, text="Sale Total: $0.00", font=('TkDefaultFont', 10, 'bold'))
         self.order_total_label.pack(fill='x', pady=2)
@@ -4214,23 +4725,26 @@ Version: 2.0
         total_price = 0
         total_cigars = 0
         
-        for cigar in self.inventory:
-            cigar_name = cigar.get('cigar', '')
-            if self.checkbox_states.get(cigar_name, False):
-                try:
-                    # Get quantity from spinbox
-                    quantity = int(self.quantity_spinboxes[cigar_name].get())
-                    # Get price per stick
-                    price_per_stick = float(cigar.get('price_per_stick', 0))
+        # Only checked cigars count, so look those up instead of walking the inventory
+        checked = [name for name, is_checked in self.checkbox_states.items() if is_checked]
+        for cigar_name in checked:
+            cigar = self.find_cigar(cigar_name)
+            if cigar is None:
+                continue
+            try:
+                # Get quantity from the row's quantity variable
+                quantity = int(self.quantity_vars[cigar_name].get())
+                # Get price per stick
+                price_per_stick = float(cigar.get('price_per_stick', 0))
                     
-                    # Calculate total for this cigar
-                    total_price += price_per_stick * quantity
-                    total_cigars += quantity
+                # Calculate total for this cigar
+                total_price += price_per_stick * quantity
+                total_cigars += quantity
                     
-                except (ValueError, KeyError):
-                    # If there's an error with the spinbox, assume quantity of 1
-                    total_price += float(cigar.get('price_per_stick', 0))
-                    total_cigars += 1
+            except (ValueError, KeyError):
+                # If there's an error with the spinbox, assume quantity of 1
+                total_price += float(cigar.get('price_per_stick', 0))
+                total_cigars += 1
         
         # Update the labels
         self.order_total_label.config(text=f"Sale Total: ${total_price:.2f}")
@@ -4259,137 +4773,208 @@ Version: 2.0
         """Update the inventory totals display."""
         total_count = 0
         total_value = 0.0
-        total_items = 0  # Count all items, not just those with stock
+        total_shipping = 0.0
+        total_items = 0  # Items with stock
 
+        # One pass over the inventory; fields loaded from JSON are already numbers,
+        # so only coerce the odd one that was stored as text
         for cigar in self.inventory:
-            count = int(cigar.get('count', 0))
+            count = cigar.get('count', 0)
+            if type(count) is not int:
+                count = int(count)
             if count > 0:
+                price_per_stick = cigar.get('price_per_stick', 0)
+                shipping = cigar.get('shipping', 0)
+                if type(price_per_stick) is not float:
+                    price_per_stick = float(price_per_stick)
+                if type(shipping) is not float:
+                    shipping = float(shipping)
+                
                 # Calculate total count
                 total_count += count
                 
                 # Calculate total value using price_per_stick × count
-                price_per_stick = float(cigar.get('price_per_stick', 0))
-                total_value += (price_per_stick * count)
+                total_value += price_per_stick * count
+                total_shipping += shipping
                 total_items += 1
 
+        self._inventory_totals = (total_count, total_value, total_shipping, total_items)
+        self._show_inventory_totals()
+
+    def _totals_contribution(self, cigar):
+        """What one record adds to (count, value, shipping, items with stock)."""
+        count = int(cigar.get('count', 0))
+        if count <= 0:
+            return (0, 0.0, 0.0, 0)
+        return (count, float(cigar.get('price_per_stick', 0)) * count, float(cigar.get('shipping', 0)), 1)
+
+    def _adjust_inventory_totals(self, before, after):
+        """Apply one record's edit to the totals without rescanning the inventory."""
+        if self._inventory_totals is None:
+            self.update_inventory_totals()
+            return
+        # Rounded so repeated float deltas can't drift into a '-0.00' label
+        self._inventory_totals = tuple(
+            round(total - old + new, 6) for total, old, new in zip(self._inventory_totals, before, after))
+        self._show_inventory_totals()
+
+    def _show_inventory_totals(self):
+        """Render the running inventory totals into the totals labels."""
+        total_count, total_value, total_shipping, total_items = self._inventory_totals
+
         # Calculate average shipping for items with stock
-        avg_shipping = sum(float(cigar.get('shipping', 0)) for cigar in self.inventory if int(cigar.get('count', 0)) > 0) / total_items if total_items > 0 else 0
+        avg_shipping = total_shipping / total_items if total_items > 0 else 0
         
         # Calculate average price per stick
         avg_price_stick = total_value / total_count if total_count > 0 else 0
 
-        # Update labels with formatted values
-        self.total_count_label.config(text=f"Total Count: {total_count}")
-        self.total_value_label.config(text=f"Total Value: ${total_value:.2f}")
-        self.avg_shipping_label.config(text=f"Avg Shipping: ${avg_shipping:.2f}")
-        self.avg_price_stick_label.config(text=f"Avg Price/Stick: ${avg_price_stick:.2f}")
+        # Update labels with formatted values, skipping the Tk calls when nothing changed
+        texts = (f"Total Count: {total_count}",
+                 f"Total Value: ${total_value:.2f}",
+                 f"Avg Shipping: ${avg_shipping:.2f}",
+                 f"Avg Price/Stick: ${avg_price_stick:.2f}")
+        if texts == self._totals_text:
+            return
+        self._totals_text = texts
+        self.total_count_label.config(text=texts[0])
+        self.total_value_label.config(text=texts[1])
+        self.avg_shipping_label.config(text=texts[2])
+        self.avg_price_stick_label.config(text=texts[3])
 
     def update_selected_cigars_display(self):
         """Update the display of selected cigars and their quantity controls."""
-        # Store current quantities before clearing
-        current_quantities = {}
-        for cigar_name, spinbox in self.quantity_spinboxes.items():
-            try:
-                current_quantities[cigar_name] = spinbox.get()
-            except:
-                pass
-
-        # Clear existing widgets except totals frame
-        for widget in self.selected_cigars_frame.winfo_children():
-            if widget != self.totals_frame:
-                widget.destroy()
+        # Keep the quantities of cigars that stay selected, default new ones to 1
+        previous_quantities = self.quantity_vars
+        self.quantity_vars = {}
+
+        # Selected cigars, in inventory order
+        selected = [cigar for cigar in self.inventory
+                    if self.checkbox_states.get(cigar.get('cigar', ''), False)]
+        for cigar in selected:
+            cigar_name = cigar.get('cigar', '')
+            quantity = previous_quantities.get(cigar_name)
+            if quantity is None:
+                quantity = tk.StringVar(value="1")
+            self.quantity_vars[cigar_name] = quantity
+        self._selected_cigars = selected
         
-        # Clear the spinboxes dictionary
-        self.quantity_spinboxes.clear()
+        # Reassign the pooled rows to whatever is now in view
+        self._render_selected_rows(force=True)
 
-        # Add selected cigars with quantity controls
-        for cigar in self.inventory:
+        # Update order total
+        self.update_order_total()
+
+    def _render_selected_rows(self, force=False):
+        """Place pooled row widgets over the selected cigars currently in view."""
+        canvas = self._selected_canvas
+        selected = self._selected_cigars
+        if not self._selected_cigar_rows:
+            if not selected:
+                return
+            # The first row fixes the row height used to lay out the list
+            self._selected_cigar_rows.append(self._create_selected_cigar_row())
+        row_height = self._selected_row_height
+        width = canvas.winfo_width()
+
+        # Size the scroll region for every selected cigar, not just the ones with widgets
+        region = (0, 0, width, len(selected) * row_height)
+        if force or canvas.cget('scrollregion') != ' '.join(map(str, region)):
+            canvas.configure(scrollregion=region)
+
+        first = max(0, int(canvas.canvasy(0) // row_height))
+        if first == self._selected_first and not force:
+            return
+        self._selected_first = first
+        shown = selected[first:first + canvas.winfo_height() // row_height + 2]
+
+        # Grow the pool only when more rows fit in view than ever before
+        while len(self._selected_cigar_rows) < len(shown):
+            self._selected_cigar_rows.append(self._create_selected_cigar_row())
+
+        for index, row in enumerate(self._selected_cigar_rows):
+            if index >= len(shown):
+                canvas.itemconfigure(row['window'], state='hidden')
+                continue
+            cigar = shown[index]
             cigar_name = cigar.get('cigar', '')
-            if self.checkbox_states.get(cigar_name, False):
-                # Create frame for this cigar
-                cigar_frame = ttk.Frame(self.selected_cigars_frame)
-                cigar_frame.pack(fill='x', pady=2)
-
-                # Add cigar name label
-                name_label = ttk.Label(cigar_frame, text=f"{cigar.get('brand', '')} - {cigar_name}")
-                name_label.pack(side='left', padx=5)
-
-                # Add quantity spinbox
-                # Use stored quantity if it exists, otherwise default to 1
-                initial_quantity = current_quantities.get(cigar_name, "1")
-                
-                def make_spinbox_update(cigar_name):
-                    def update_wrapper(*args):
-                        self.update_order_total()
-                    return update_wrapper
-
-                spinbox = ttk.Spinbox(
-                    cigar_frame,
-                    from_=1,
-                    to=cigar.get('count', 99),
-                    width=5,
-                    command=make_spinbox_update(cigar_name)
-                )
-                spinbox.set(initial_quantity)
-                spinbox.pack(side='right', padx=5)
-                
-                # Bind the spinbox to update totals when value is changed manually
-                spinbox.bind('<KeyRelease>', make_spinbox_update(cigar_name))
-                
-                # Store the spinbox reference
-                self.quantity_spinboxes[cigar_name] = spinbox
+            row['name_label'].config(text=f"{cigar.get('brand', '')} - {cigar_name}")
+            row['spinbox'].config(to=cigar.get('count', 99), textvariable=self.quantity_vars[cigar_name])
+            canvas.coords(row['window'], 0, (first + index) * row_height)
+            canvas.itemconfigure(row['window'], state='normal', width=width)
 
-                # Add quantity label
-                ttk.Label(cigar_frame, text="Qty:").pack(side='right', padx=2)
+    def _create_selected_cigar_row(self):
+        """Build one reusable row (name, quantity spinbox) for the selected cigars list."""
+        canvas = self._selected_canvas
+        cigar_frame = ttk.Frame(canvas)
 
-        # Ensure totals frame stays at the bottom
-        self.totals_frame.pack_forget()
-        ttk.Separator(self.selected_cigars_frame, orient='horizontal').pack(fill='x', pady=10)
-        self.totals_frame.pack(fill='x', pady=5, side='bottom')
+        # Add cigar name label
+        name_label = ttk.Label(cigar_frame)
+        name_label.pack(side='left', padx=5)
 
-        # Update order total
+        # Add quantity spinbox that updates totals from the arrows or when typed into
+        spinbox = ttk.Spinbox(
+            cigar_frame,
+            from_=1,
+            to=99,
+            width=5,
+            command=self.update_order_total
+        )
+        spinbox.pack(side='right', padx=5)
+        spinbox.bind('<KeyRelease>', self._on_qty_change)
+
+        # Add quantity label
+        ttk.Label(cigar_frame, text="Qty:").pack(side='right', padx=2)
+
+        # Scroll the list from anywhere on the row
+        for widget in (cigar_frame, name_label):
+            widget.bind('<MouseWheel>', lambda e: canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
+
+        if self._selected_row_height is None:
+            cigar_frame.update_idletasks()
+            self._selected_row_height = cigar_frame.winfo_reqheight() + 4
+        window = canvas.create_window(0, 0, window=cigar_frame, anchor='nw', state='hidden')
+        return {'frame': cigar_frame, 'name_label': name_label, 'spinbox': spinbox, 'window': window}
+
+    def _on_qty_change(self, event=None):
+        """Update the order total once typing in a quantity spinbox pauses."""
+        if self._order_total_after_id:
+            self.root.after_cancel(self._order_total_after_id)
+        self._order_total_after_id = self.root.after(50, self._do_order_total)
+
+    def _do_order_total(self):
+        self._order_total_after_id = None
         self.update_order_total()
 
+    def _on_root_configure(self, event):
+        # Child widgets' <Configure> events also reach the root binding
+        if event.widget is self.root:
+            self._parent_geom = (event.x, event.y, event.width, event.height)
+
+    def _center_on_root(self, width, height):
+        """Return the x, y that centers a width x height window over the main window."""
+        if self._parent_geom is None:
+            self._parent_geom = (self.root.winfo_x(), self.root.winfo_y(),
+                                 self.root.winfo_width(), self.root.winfo_height())
+        parent_x, parent_y, parent_width, parent_height = self._parent_geom
+        return parent_x + (parent_width - width) // 2, parent_y + (parent_height - height) // 2
+
     def show_sale_confirmation(self, sale_records, selected_cigars):
         """Show a nicely formatted sale confirmation dialog with undo option."""
         dialog = tk.Toplevel(self.root)
         dialog.title("Sale")
-        dialog.geometry("400x500")
+        # Size and center relative to the main window in one geometry call
+        x, y = self._center_on_root(400, 500)
+        dialog.geometry(f"400x500+{x}+{y}")
         dialog.transient(self.root)
         dialog.grab_set()
 
-        # Center the dialog relative to the main window
-        dialog.update_idletasks()
-        dialog_width = dialog.winfo_width()
-        dialog_height = dialog.winfo_height()
-        parent_x = self.root.winfo_x()
-        parent_y = self.root.winfo_y()
-        parent_width = self.root.winfo_width()
-        parent_height = self.root.winfo_height()
-        
-        x = parent_x + (parent_width - dialog_width) // 2
-        y = parent_y + (parent_height - dialog_height) // 2
-        
-        dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
-
         # Main frame with padding
         main_frame = ttk.Frame(dialog, padding="10")
         main_frame.pack(fill='both', expand=True)
 
         # Sale details in a treeview
-        columns = ('cigar', 'quantity', 'price', 'total')
-        tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=10)
-        
-        # Configure columns
-        tree.heading('cigar', text='Cigar')
-        tree.heading('quantity', text='Qty')
-        tree.heading('price', text='Price/Stick')
-        tree.heading('total', text='Total')
-        
-        tree.column('cigar', width=150)
-        tree.column('quantity', width=50)
-        tree.column('price', width=80)
-        tree.column('total', width=80)
+        tree = ttk.Treeview(main_frame, columns=tuple(SALE_CONFIRMATION_COLUMNS), show='headings', height=10)
+        _apply_columns(tree, SALE_CONFIRMATION_COLUMNS)
 
         # Add scrollbar
         scrollbar = ttk.Scrollbar(main_frame, orient='vertical', command=tree.yview)
@@ -4434,14 +5019,16 @@ Version: 2.0
             if messagebox.askyesno("Confirm Undo", "Are you sure you want to undo this sale?"):
                 # Restore inventory counts
                 for cigar_name, quantity in selected_cigars:
-                    for cigar in self.inventory:
-                        if cigar['cigar'] == cigar_name:
-                            cigar['count'] = int(cigar['count']) + quantity
-                            break
+                    cigar = self.find_cigar(cigar_name)
+                    if cigar:
+                        cigar['count'] += quantity
                 
-                # Remove sale records
-                for record in sale_records:
-                    self.sales_history.remove(record)
+                # Remove sale records in one pass; match on keys rather than
+                # identity since the history may have been reloaded meanwhile
+                to_remove = {(record.get('transaction_id'), record['date'], record['cigar'])
+                             for record in sale_records}
+                self.sales_history = [sale for sale in self.sales_history
+                                      if (sale.get('transaction_id'), sale.get('date'), sale.get('cigar')) not in to_remove]
                 
                 # Save changes
                 self.save_inventory()
@@ -4449,7 +5036,8 @@ Version: 2.0
                 
                 # Refresh displays
                 self.refresh_inventory()
-                self.refresh_sales_history()
+                for transaction_id in {record.get('transaction_id') for record in sale_records}:
+                    self.remove_sale_transaction(transaction_id)
                 
                 dialog.destroy()
                 messagebox.showinfo("Success", "Sale has been undone")
@@ -4468,13 +5056,15 @@ Version: 2.0
         sale_records = []
         sale_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         transaction_id = str(uuid.uuid4())  # Generate unique transaction ID
+        checked = []  # Every checked row loses its check mark, so these are the rows to redraw
         
-        # Process each selected cigar
-        for cigar in self.inventory:
-            cigar_name = cigar.get('cigar', '')
-            if self.checkbox_states.get(cigar_name, False):
+        # Process each selected cigar in the panel's inventory order, resolved through the name index
+        for cigar_name in dict.fromkeys(cigar.get('cigar', '') for cigar in self._selected_cigars):
+            cigar = self.find_cigar(cigar_name) if self.checkbox_states.get(cigar_name) else None
+            if cigar:
+                checked.append(cigar)
                 try:
-                    quantity = int(self.quantity_spinboxes[cigar_name].get())
+                    quantity = int(self.quantity_vars[cigar_name].get())
                     if quantity < 1:
                         messagebox.showwarning("Warning", f"Purchase quantity for {cigar_name} must be at least 1")
                         continue
@@ -4482,14 +5072,15 @@ Version: 2.0
                     messagebox.showwarning("Warning", f"Invalid purchase quantity for {cigar_name}")
                     continue
 
-                current_count = int(cigar.get('count', 0))
+                current_count = cigar.get('count', 0)
                 if current_count >= quantity:  # Check if we have enough stock
                     # Calculate total cost for this sale
-                    price_per_stick = float(cigar.get('price_per_stick', 0))
+                    price_per_stick = cigar.get('price_per_stick', 0)
                     total_cost = price_per_stick * quantity
 
                     # Create sale record
                     sale_record = {
+                        'sale_id': uuid.uuid4().hex,
                         'transaction_id': transaction_id,  # Add transaction ID
                         'date': sale_date,
                         'brand': cigar.get('brand', ''),
@@ -4515,13 +5106,11 @@ Version: 2.0
             
             # Clear checkboxes and update displays
             self.checkbox_states = {}
-            self.quantity_spinboxes.clear()
+            self.quantity_vars.clear()
             
             # Refresh displays
-            self.refresh_inventory()
-            self.refresh_sales_history()
-            self.update_selected_cigars_display()
-            self.update_inventory_totals()
+            self.update_inventory_rows(checked, selection_changed=True)
+            self.add_sale_transaction(sale_records)
             
             # Show sale confirmation dialog
             self.show_sale_confirmation(sale_records, selected_cigars)
@@ -4535,58 +5124,62 @@ Version: 2.0
         history_window.geometry("800x600")
         
         # Create treeview for sales history
-        columns = ('date', 'brand', 'cigar', 'size', 'price_per_stick')
-        tree = ttk.Treeview(history_window, columns=columns, show='headings')
-        
-        # Configure columns
-        headings = {
-            'date': 'Date',
-            'brand': 'Brand',
-            'cigar': 'Cigar',
-            'size': 'Size',
-            'price_per_stick': 'Price/Stick'
-        }
-        
-        for col, heading in headings.items():
-            tree.heading(col, text=heading)
-            tree.column(col, width=150)
+        tree = ttk.Treeview(history_window, columns=tuple(SALES_HISTORY_COLUMNS), show='headings')
+        _apply_columns(tree, SALES_HISTORY_COLUMNS)
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(history_window, orient='vertical', command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack widgets
         tree.pack(side='left', expand=True, fill='both')
         scrollbar.pack(side='right', fill='y')
         
+        # Rows are added a page at a time, newest first, as the list is scrolled
+        # towards its end, so the window opens at once however long the history is
+        history = []
+        remaining = 0  # Sales not yet shown are history[:remaining]
+        
+        text_fields = operator.itemgetter('date', 'brand', 'cigar', 'size')
+        
+        def load_page(page_size=200):
+            nonlocal remaining
+            stop = max(0, remaining - page_size)
+            insert = tree.insert
+            for sale in reversed(history[stop:remaining]):
+                insert('', 'end', values=text_fields(sale) + ("$%.2f" % sale['price_per_stick'],))
+            remaining = stop
+        
+        def on_tree_scroll(first, last):
+            scrollbar.set(first, last)
+            if remaining and float(last) > 0.9:
+                load_page()
+        
+        tree.configure(yscrollcommand=on_tree_scroll)
+        
         # Load and display sales history
         try:
             self.load_sales_history()
-            for sale in reversed(self.sales_history):  # Show newest first
-                values = (
-                    sale['date'],
-                    sale['brand'],
-                    sale['cigar'],
-                    sale['size'],
-                    f"${sale['price_per_stick']:.2f}"
-                )
-                tree.insert('', 'end', values=values)
+            history = self.sales_history
+            remaining = len(history)
+            load_page()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load sales history: {str(e)}")
 
     def save_sales_history(self):
-        """Save sales history to JSON file."""
+        """Append changes since the last save to the sales log."""
         try:
-            with open(self.get_data_file_path('sales_history.json'), 'w') as f:
-                json.dump(self.sales_history, f, indent=2)
+            self._save_record_log('sales_history.jsonl', self.sales_history, 'sale_id', _sale_log_state)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save sales history: {str(e)}")
 
     def load_sales_history(self):
-        """Load sales history from JSON file."""
+        """Load sales history by replaying the sales log."""
+        self.wait_for_writes()
+        self._sale_row_cache = {}  # The records are about to be replaced
+        path = self.get_data_file_path('sales_history.jsonl')
+        legacy_path = self.get_data_file_path('sales_history.json')
         try:
-            with open(self.get_data_file_path('sales_history.json'), 'r') as f:
-                self.sales_history = json.load(f)
+            self.sales_history, needs_compaction = self._load_record_log(path, legacy_path, 'sale_id')
                 
             # Update old format records to new format
             for sale in self.sales_history:
@@ -4600,32 +5193,123 @@ Version: 2.0
                     # This groups sales that happened at the same time
                     sale['transaction_id'] = str(uuid.uuid5(uuid.NAMESPACE_DNS, 
                                                           f"{sale.get('date', '')}-{sale.get('cigar', '')}"))
+                if not sale.get('sale_id'):
+                    sale['sale_id'] = uuid.uuid4().hex
+                    needs_compaction = True
+                # Numbers once here, so the history views don't reparse them
+                for key, kind in (('quantity', int), ('price_per_stick', float), ('total_cost', float)):
+                    value = sale.get(key)
+                    if value is not None and type(value) is not kind:
+                        sale[key] = _to_number(value, kind, sale)
+            
+            self._track_record_log(path, self.sales_history, 'sale_id', _sale_log_state, needs_compaction)
                     
         except FileNotFoundError:
             self.sales_history = []
+            self._track_record_log(path, self.sales_history, 'sale_id', _sale_log_state)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load sales history: {str(e)}")
             self.sales_history = []
+            # Only append from here on so the unreadable log is not overwritten
+            self._track_record_log(path, self.sales_history, 'sale_id', _sale_log_state)
 
     def save_resupply_history(self):
-        """Save resupply history to JSON file."""
+        """Append changes since the last save to the resupply log."""
         try:
-            with open(self.get_data_file_path('resupply_history.json'), 'w') as f:
-                json.dump(self.resupply_history, f, indent=2)
+            self._save_record_log('resupply_history.jsonl', self.resupply_history, 'resupply_id',
+                                  _resupply_log_state)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save resupply history: {str(e)}")
 
     def load_resupply_history(self):
-        """Load resupply history from JSON file."""
+        """Load resupply history by replaying the resupply log."""
+        self.wait_for_writes()
+        path = self.get_data_file_path('resupply_history.jsonl')
+        legacy_path = self.get_data_file_path('resupply_history.json')
         try:
-            with open(self.get_data_file_path('resupply_history.json'), 'r') as f:
-                self.resupply_history = json.load(f)
+            self.resupply_history, needs_compaction = self._load_record_log(path, legacy_path, 'resupply_id')
+            for resupply in self.resupply_history:
+                if not resupply.get('resupply_id'):
+                    resupply['resupply_id'] = uuid.uuid4().hex
+                    needs_compaction = True
+            self._track_record_log(path, self.resupply_history, 'resupply_id', _resupply_log_state,
+                                   needs_compaction)
                     
         except FileNotFoundError:
             self.resupply_history = []
+            self._track_record_log(path, self.resupply_history, 'resupply_id', _resupply_log_state)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load resupply history: {str(e)}")
             self.resupply_history = []
+            # Only append from here on so the unreadable log is not overwritten
+            self._track_record_log(path, self.resupply_history, 'resupply_id', _resupply_log_state)
+
+    def _load_record_log(self, path, legacy_path, id_key):
+        """Replay a record log into its live records; returns (records, needs_compaction)."""
+        if not os.path.exists(path) and os.path.exists(legacy_path):
+            # Migrate the old single-array file; it is left in place untouched
+            return _load_json(legacy_path), True
+        
+        records_by_id = {}
+        line_count = 0
+        torn = False
+        # Read in 64 KB chunks rather than the default 8 KB while splitting lines
+        with open(path, 'rb', buffering=1 << 16) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                line_count += 1
+                try:
+                    entry = _parse_json(line)
+                except ValueError:
+                    # A crash mid-append can leave a torn last line
+                    print(f"Skipping unreadable line {line_count} of {os.path.basename(path)}")
+                    torn = True
+                    continue
+                if 'undo' in entry:
+                    records_by_id.pop(entry['undo'], None)
+                else:
+                    records_by_id[entry.get(id_key)] = entry
+        records = list(records_by_id.values())
+        # Compact once more than 20% of the log is superseded lines, or to drop a torn
+        # line that the next append would otherwise be glued onto
+        return records, torn or line_count - len(records) > line_count * 0.2
+
+    def _track_record_log(self, path, records, id_key, state, compact=False):
+        """Remember what the log at path holds, rewriting it first if asked."""
+        if compact:
+            for record in records:
+                record.setdefault(id_key, uuid.uuid4().hex)
+            self._write_in_background(_data_file_title(path), _write_atomic, path,
+                                      b''.join(_json_bytes(record) + b'\n' for record in records))
+        self._record_logs[os.path.basename(path)] = (
+            path, {record[id_key]: state(record) for record in records})
+
+    def _save_record_log(self, filename, records, id_key, state):
+        """Append the records added or changed since the last save, and undo lines for removed ones."""
+        path = self.get_data_file_path(filename)
+        log_path, logged_before = self._record_logs.get(filename, (None, None))
+        if path != log_path:
+            # First save into this directory; start its log from the full history
+            self._track_record_log(path, records, id_key, state, compact=True)
+            return
+        
+        # Records are only ever added, removed, or have the fields in their
+        # state changed by a return, so that is all we need to compare
+        lines = []
+        logged = {}
+        for record in records:
+            record_id = record.setdefault(id_key, uuid.uuid4().hex)
+            record_state = state(record)
+            logged[record_id] = record_state
+            if logged_before.get(record_id) != record_state:
+                lines.append(_json_bytes(record) + b'\n')
+        for record_id in logged_before.keys() - logged.keys():
+            lines.append(_json_bytes({'undo': record_id}) + b'\n')
+        
+        if lines:
+            self._write_in_background(_data_file_title(path), _append_bytes, path, b''.join(lines))
+        self._record_logs[filename] = (path, logged)
 
     def save_humidor_settings(self):
         """Save humidor-specific settings like tax rate."""
@@ -4634,21 +5318,19 @@ Version: 2.0
                 'tax_rate': self.tax_rate,
                 'humidor_name': self.humidor_name
             }
-            with open(self.get_data_file_path('humidor_settings.json'), 'w') as f:
-                json.dump(settings, f, indent=2)
+            self._write_data_file('humidor settings', 'humidor_settings.json', settings)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save humidor settings: {str(e)}")
 
     def load_humidor_settings(self):
         """Load humidor-specific settings like tax rate."""
         try:
-            with open(self.get_data_file_path('humidor_settings.json'), 'r') as f:
-                settings = json.load(f)
-                self.tax_rate = settings.get('tax_rate', 0.086)  # Default to 8.6%
-                # Update humidor name if saved
-                saved_name = settings.get('humidor_name')
-                if saved_name:
-                    self.humidor_name = saved_name
+            settings = self._load_data_json('humidor_settings.json')
+            self.tax_rate = settings.get('tax_rate', 0.086)  # Default to 8.6%
+            # Update humidor name if saved
+            saved_name = settings.get('humidor_name')
+            if saved_name:
+                self.humidor_name = saved_name
         except FileNotFoundError:
             # Use defaults if file doesn't exist
             self.tax_rate = 0.086  # Default 8.6%
@@ -4659,8 +5341,8 @@ Version: 2.0
     def manual_save(self):
         """Manually save all data and show confirmation."""
         try:
-            # Save inventory
-            self.save_inventory()
+            # Save inventory, including any pending inline edits
+            self._flush_inventory(force=True)
             
             # Save brands, sizes, and types
             self.save_brands()
@@ -4674,7 +5356,9 @@ Version: 2.0
             # Save humidor settings
             self.save_humidor_settings()
             
-            messagebox.showinfo("Success", "All data has been saved successfully!")
+            # Only confirm once everything is actually on disk
+            if self.wait_for_writes():
+                messagebox.showinfo("Success", "All data has been saved successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save data: {str(e)}")
 
@@ -4695,32 +5379,28 @@ Version: 2.0
 
     def refresh_transaction_details(self):
         """Refresh the details view for the currently selected transaction."""
-        # Clear existing details
-        self.detail_tree.delete(*self.detail_tree.get_children())
-
-        if not self.current_transaction_id:
-            return
-
-        # Load and display details for the selected transaction
-        for sale in self.sales_history:
-            if sale.get('transaction_id') == self.current_transaction_id:
-                # Get all the sale details
-                cigar_name = sale.get('cigar', 'Unknown')
-                brand = sale.get('brand', 'Unknown')
-                size = sale.get('size', 'N/A')
-                quantity = int(sale.get('quantity', 1))
-                price_per_stick = float(sale.get('price_per_stick', 0))
-                total_cost = float(sale.get('total_cost', 0))
+        sales = self._sales_index().get(self.current_transaction_id, ()) if self.current_transaction_id else ()
+        _fill_tree(self.detail_tree, [self._sale_detail_values(sale) for sale in sales])
                 
-                values = (
-                    cigar_name,
-                    brand,
-                    size,
-                    str(quantity),
-                    f"${price_per_stick:.2f}",
-                    f"${total_cost:.2f}"
-                )
-                self.detail_tree.insert('', 'end', values=values)
+    def _sale_detail_values(self, sale):
+        """Detail row values for one sale, formatted once and reused while the sale is unchanged."""
+        get = sale.get
+        source = (get('cigar', 'Unknown'), get('brand', 'Unknown'), get('size', 'N/A'),
+                  get('quantity', 1), get('price_per_stick', 0), get('total_cost', 0))
+        cached = self._sale_row_cache.get(id(sale))
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        cigar_name, brand, size, quantity, price_per_stick, total_cost = source
+        values = (
+            cigar_name,
+            brand,
+            size,
+            str(quantity),
+            "$%.2f" % price_per_stick,
+            "$%.2f" % total_cost
+        )
+        self._sale_row_cache[id(sale)] = (source, values)
+        return values
 
     def return_selected_items(self):
         """Handle partial return of selected items from the current transaction."""
@@ -4973,22 +5653,22 @@ Version: 2.0
 
         def confirm_return():
             # Process each return
+            returned_sales = set()
             for cigar_name, brand, return_qty, original_qty in return_list:
                 # Add back to inventory
                 for cigar in self.inventory:
                     if cigar['cigar'] == cigar_name:
-                        cigar['count'] = int(cigar['count']) + return_qty
+                        cigar['count'] += return_qty
                         break
 
                 # Update or remove sales records
-                for sale in self.sales_history:
-                    if (sale.get('transaction_id') == current_transaction_id and 
-                        sale.get('cigar') == cigar_name):
+                for sale in self._sales_index().get(current_transaction_id, ()):
+                    if sale.get('cigar') == cigar_name:
                         
                         current_sale_qty = int(sale.get('quantity', 1))
                         if return_qty >= current_sale_qty:
-                            # Remove entire sale record
-                            self.sales_history.remove(sale)
+                            # Drop the entire sale record after the loop
+                            returned_sales.add(id(sale))
                         else:
                             # Reduce quantity and recalculate cost
                             new_qty = current_sale_qty - return_qty
@@ -4997,11 +5677,15 @@ Version: 2.0
                             sale['total_cost'] = price_per_stick * new_qty
                         break
 
+            # Remove fully returned sale records in one pass
+            if returned_sales:
+                self.sales_history = [sale for sale in self.sales_history
+                                      if id(sale) not in returned_sales]
+
             # Save changes and refresh displays
             self.save_inventory()
             self.save_sales_history()
             self.refresh_inventory()
-            self.update_inventory_totals()
             
             dialog.destroy()
             messagebox.showinfo("Success", f"Successfully returned {total_items} items.")
@@ -5026,24 +5710,20 @@ Version: 2.0
         total_items = 0
         total_value = 0.0
         
-        for sale in self.sales_history:
-            if sale.get('transaction_id') == self.current_transaction_id:
-                quantity = int(sale.get('quantity', 1))
-                total_cost = float(sale.get('total_cost', 0))
-                transaction_items.append((sale.get('cigar'), sale.get('brand'), quantity))
-                total_items += quantity
-                total_value += total_cost
+        for sale in self._sales_index().get(self.current_transaction_id, ()):
+            quantity = int(sale.get('quantity', 1))
+            total_cost = float(sale.get('total_cost', 0))
+            transaction_items.append((sale.get('cigar'), sale.get('brand'), quantity))
+            total_items += quantity
+            total_value += total_cost
 
         if not transaction_items:
             messagebox.showwarning("Warning", "No items found in this transaction.")
             return
 
         # Get transaction date for confirmation
-        transaction_date = "Unknown"
-        for sale in self.sales_history:
-            if sale.get('transaction_id') == self.current_transaction_id:
-                transaction_date = sale.get('date', 'Unknown')
-                break
+        transaction_sales = self._sales_index().get(self.current_transaction_id)
+        transaction_date = transaction_sales[0].get('date', 'Unknown') if transaction_sales else "Unknown"
 
         # Single confirmation for entire transaction
         confirm_msg = f"Are you sure you want to return the entire transaction?\n\n"
@@ -5070,7 +5750,6 @@ Version: 2.0
             self.save_inventory()
             self.save_sales_history()
             self.refresh_inventory()
-            self.update_inventory_totals()
             
             # Refresh both this window and main application
             refresh_local_display()
@@ -5145,7 +5824,13 @@ Version: 2.0
 
     def get_data_file_path(self, filename):
         """Get the full path for a data file in the current data directory."""
-        return os.path.join(self.data_directory, filename)
+        # Keyed by directory too, so switching humidors needs no invalidation
+        key = (self.data_directory, filename)
+        try:
+            return self._data_paths[key]
+        except KeyError:
+            path = self._data_paths[key] = os.path.join(self.data_directory, filename)
+            return path
 
     def update_location_display(self):
         """Update the location display labels."""
@@ -5162,6 +5847,7 @@ Version: 2.0
         )
         
         if new_directory:
+            self._flush_inventory()  # Pending edits belong to the humidor being left
             self.data_directory = new_directory
             # Try to determine humidor name from directory
             dir_name = os.path.basename(new_directory)
@@ -5213,6 +5899,7 @@ Version: 2.0
                 os.makedirs(new_directory)
             
             # Set new directory and name
+            self._flush_inventory()  # Pending edits belong to the humidor being left
             self.data_directory = new_directory
             self.humidor_name = humidor_name
             self.update_location_display()
@@ -5267,6 +5954,7 @@ Version: 2.0
                     )
                     
                     if humidor_name:
+                        self._flush_inventory()  # Pending edits belong to the humidor being left
                         self.data_directory = new_directory
                         self.humidor_name = humidor_name
                         self.update_location_display()
@@ -5293,6 +5981,7 @@ Version: 2.0
                 return
             
             # Load existing humidor
+            self._flush_inventory()  # Pending edits belong to the humidor being left
             self.data_directory = new_directory
             dir_name = os.path.basename(new_directory)
             self.humidor_name = dir_name if dir_name != "." else "Loaded Humidor"
@@ -5329,9 +6018,14 @@ Version: 2.0
                 import zipfile
                 import glob
                 
+                # Make sure pending inline edits are in the files being zipped
+                self._flush_inventory()
+                self.wait_for_writes()
+                
                 with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # Add all JSON files from the data directory
-                    json_files = glob.glob(os.path.join(self.data_directory, "*.json"))
+                    # Add all JSON and JSON-lines files from the data directory
+                    json_files = (glob.glob(os.path.join(self.data_directory, "*.json")) +
+                                  glob.glob(os.path.join(self.data_directory, "*.jsonl")))
                     for file_path in json_files:
                         filename = os.path.basename(file_path)
                         zipf.write(file_path, filename)
@@ -5361,76 +6055,92 @@ Version: 2.0
         if not hasattr(self, 'transaction_tree') or not hasattr(self, 'detail_tree'):
             return  # UI not created yet, skip refresh
             
-        # Clear current display
-        for item in self.transaction_tree.get_children():
-            self.transaction_tree.delete(item)
+        # Clear current display in one call
+        self.transaction_tree.delete(*self.transaction_tree.get_children())
             
         # Clear detail view if no transaction is selected
         if not hasattr(self, 'current_transaction_id') or not self.current_transaction_id:
-            for item in self.detail_tree.get_children():
-                self.detail_tree.delete(item)
-        
-        # Group sales by transaction_id
-        transactions = {}
-        for sale in self.sales_history:
-            transaction_id = sale.get('transaction_id', 'unknown')
-            if transaction_id not in transactions:
-                transactions[transaction_id] = []
-            transactions[transaction_id].append(sale)
-        
-        # Store transaction ID mapping for later retrieval
-        if not hasattr(self, 'transaction_id_map'):
-            self.transaction_id_map = {}
+            self.detail_tree.delete(*self.detail_tree.get_children())
         
-        # Display transactions (newest first)
-        sorted_transactions = sorted(
-            transactions.items(), 
-            key=lambda x: x[1][0].get('date', ''), 
-            reverse=True
-        )
+        # Store transaction ID mapping for later retrieval, in both directions
+        # so single transactions can be added or removed without a rebuild
+        self.transaction_id_map = {}
+        self._transaction_iids = {}
         
-        for transaction_id, sales in sorted_transactions:
-            try:
-                # Calculate transaction totals
-                total_items = sum(int(sale.get('quantity', 1)) for sale in sales)
-                total_value = sum(float(sale.get('total_cost', 0)) for sale in sales)
-                
-                # Use the date from the first sale in the transaction
-                date = sales[0].get('date', 'Unknown')
-                
-                # Create transaction summary
-                values = (
-                    date,
-                    str(total_items),
-                    f"${total_value:.2f}"
-                )
-                
-                # Insert the item and store the transaction_id in our mapping
-                item_id = self.transaction_tree.insert('', 'end', values=values)
-                self.transaction_id_map[item_id] = transaction_id
+        # Display transactions (newest first); the scrollbar is detached while
+        # the rows go in so it is updated once at the end rather than per insert
+        yscrollcommand = self.transaction_tree.cget('yscrollcommand')
+        self.transaction_tree.configure(yscrollcommand='')
+        try:
+            for transaction_id, sales in self._sales_by_transaction():
+                try:
+                    self._insert_sale_transaction('end', transaction_id, sales)
                 
-            except Exception as e:
-                print(f"Error displaying transaction {transaction_id}: {e}")
+                except Exception as e:
+                    print(f"Error displaying transaction {transaction_id}: {e}")
+        finally:
+            self.transaction_tree.configure(yscrollcommand=yscrollcommand)
         
         # If we have a current transaction selected, refresh its details
         if hasattr(self, 'current_transaction_id') and self.current_transaction_id:
+            # Reselect its new row, so the select event from clearing the old one keeps it
+            item_id = self._transaction_iids.get(self.current_transaction_id)
+            if item_id is not None:
+                self.transaction_tree.selection_set(item_id)
             self.refresh_transaction_details()
 
-    # Add new method after the setup_resupply_tab method
-    def refresh_resupply_dropdowns(self):
-        """Refresh the resupply tab dropdown values after data is loaded."""
-        # Update brand dropdown
-        self.resupply_brand_combo.config(values=sorted(list(self.brands)))
-        
-        # Update cigar dropdown with all existing cigars
-        existing_cigars = sorted(list(set(cigar.get('cigar', '') for cigar in self.inventory if cigar.get('cigar', ''))))
-        self.resupply_cigar_combo.config(values=existing_cigars)
-        
-        # Update size dropdown
-        self.resupply_size_combo.config(values=sorted(list(self.sizes)))
-        
-        # Update type dropdown  
-        self.resupply_type_combo.config(values=sorted(list(self.types)))
+    def _sales_index(self):
+        """Sales grouped by transaction_id in history order, kept in step with the history."""
+        # Sales are only ever appended in place; every removal builds a new list,
+        # so the indexed list and its length tell whether the index is current
+        history = self.sales_history
+        indexed, indexed_count, index = self._sales_index_state
+        if indexed is not history or indexed_count > len(history):
+            indexed_count, index = 0, {}
+        for sale in history[indexed_count:]:
+            index.setdefault(sale.get('transaction_id', 'unknown'), []).append(sale)
+        self._sales_index_state = (history, len(history), index)
+        return index
+
+    def _sales_by_transaction(self):
+        """Sales grouped into (transaction_id, sales) pairs, newest transaction first."""
+        # History is appended oldest first, so this sort mostly just reverses one run
+        return sorted(self._sales_index().items(), key=lambda x: x[1][0].get('date', ''), reverse=True)
+
+    def _resupplies_by_order(self):
+        """Resupply records grouped into (order_id, resupplies) pairs, newest order first."""
+        orders = {}
+        for resupply in self.resupply_history:
+            orders.setdefault(resupply.get('order_id', 'unknown'), []).append(resupply)
+        return sorted(orders.items(), key=lambda x: x[1][0].get('date', ''), reverse=True)
+
+    def _insert_sale_transaction(self, index, transaction_id, sales):
+        """Insert one transaction's summary row into the sales history tree."""
+        # Insert the item and store the transaction_id in our mapping
+        item_id = self.transaction_tree.insert('', index, values=_transaction_summary(sales))
+        self.transaction_id_map[item_id] = transaction_id
+        self._transaction_iids[transaction_id] = item_id
+
+    def add_sale_transaction(self, sale_records):
+        """Show a just-made sale at the top of the sales history without a rebuild."""
+        if not hasattr(self, 'transaction_tree') or not hasattr(self, '_transaction_iids'):
+            self.refresh_sales_history()
+            return
+        # The newest sale always sorts first
+        self._insert_sale_transaction(0, sale_records[0].get('transaction_id', 'unknown'), sale_records)
+
+    def remove_sale_transaction(self, transaction_id):
+        """Drop one transaction's row from the sales history without a rebuild."""
+        if not hasattr(self, 'transaction_tree') or not hasattr(self, '_transaction_iids'):
+            self.refresh_sales_history()
+            return
+        item_id = self._transaction_iids.pop(transaction_id, None)
+        if item_id is not None:
+            self.transaction_id_map.pop(item_id, None)
+            self.transaction_tree.delete(item_id)
+        if getattr(self, 'current_transaction_id', None) == transaction_id:
+            self.current_transaction_id = None
+            self.detail_tree.delete(*self.detail_tree.get_children())
 
 def main():
     try:
@@ -1,10 +1,12 @@
 import unittest
 import tkinter as tk
-from main import CigarInventory
+from main import CigarInventory, VIRTUAL_TREE_THRESHOLD
 import json
 import os
 from datetime import datetime
 import shutil
+from types import SimpleNamespace
+from unittest import mock
 
 class TestCigarInventory(unittest.TestCase):
     @classmethod
@@ -52,6 +54,9 @@ class TestCigarInventory(unittest.TestCase):
 
     def tearDown(self):
         """Clean up after each test."""
+        # Let background writes land before their files are deleted
+        self.app.wait_for_writes()
+        
         # Restore original data directory
         self.app.data_directory = self._original_data_directory
         
@@ -88,6 +93,9 @@ class TestCigarInventory(unittest.TestCase):
         # Test zero price and shipping
         self.assertEqual(self.app.calculate_price_per_stick(0, 0, 10), 0)
 
+        # Test an original quantity that was reset to zero spreads shipping over the count
+        self.assertAlmostEqual(self.app.calculate_price_per_stick(100.00, 10.00, 10, 0), expected, places=2)
+
     def test_sorting(self):
         """Test sorting functionality."""
         # Reset sort state
@@ -185,9 +193,8 @@ class TestCigarInventory(unittest.TestCase):
         
         # Simulate sale
         self.app.checkbox_states = {self.test_cigar['cigar']: True}
-        self.app.quantity_spinboxes = {
-            self.test_cigar['cigar']: tk.StringVar(value='2')
-        }
+        self.app.update_selected_cigars_display()
+        self.app.quantity_vars[self.test_cigar['cigar']].set('2')
         
         # Process sale
         self.app.sell_selected()
@@ -201,6 +208,36 @@ class TestCigarInventory(unittest.TestCase):
         self.assertEqual(sale_record['quantity'], 2)
         self.assertEqual(sale_record['cigar'], self.test_cigar['cigar'])
 
+    def test_selected_cigars_pool(self):
+        """Test that only selected cigars in view get row widgets, and quantities follow their cigar."""
+        self.app.inventory = [dict(self.test_cigar, cigar=f'Cigar {i:03d}') for i in range(100)]
+        self.app.checkbox_states = {cigar['cigar']: True for cigar in self.app.inventory}
+        self.root.update()
+        self.app.update_selected_cigars_display()
+        
+        # Every selected cigar has a quantity, but only a screenful has widgets
+        rows = self.app._selected_cigar_rows
+        self.assertEqual(len(self.app.quantity_vars), 100)
+        self.assertLess(len(rows), 100)
+        
+        first_var = self.app.quantity_vars['Cigar 000']
+        first_var.set('3')
+        self.assertEqual(str(rows[0]['spinbox'].cget('textvariable')), str(first_var))
+        
+        # Scrolling re-points the pooled rows at other cigars
+        canvas = self.app._selected_canvas
+        canvas.yview_moveto(0.5)
+        self.app._render_selected_rows()
+        self.assertGreater(self.app._selected_first, 0)
+        self.assertNotEqual(str(rows[0]['spinbox'].cget('textvariable')), str(first_var))
+        
+        # Scrolling back, or rebuilding the list, keeps the quantity typed earlier
+        canvas.yview_moveto(0)
+        self.app._render_selected_rows()
+        self.app.update_selected_cigars_display()
+        self.assertIs(self.app.quantity_vars['Cigar 000'], first_var)
+        self.assertEqual(rows[0]['spinbox'].get(), '3')
+
     def test_shipping_calculator(self):
         """Test shipping calculator functionality."""
         # This test is disabled because the shipping calculator UI elements
@@ -246,5 +283,172 @@ class TestCigarInventory(unittest.TestCase):
         visible_items = len(self.app.tree.get_children())
         self.assertEqual(visible_items, 2)
 
+    def test_virtual_tree(self):
+        """Test that a long inventory keeps its selection and key navigation across the row window."""
+        count = VIRTUAL_TREE_THRESHOLD + 100
+        self.app.inventory = [dict(self.test_cigar, cigar=f'Cigar {i:04d}') for i in range(count)]
+        self.root.update()
+        self.app.refresh_inventory()
+        view = self.app.inventory_view
+        self.assertTrue(view.virtual)
+        self.assertLess(len(self.app.tree.get_children()), count)
+        
+        # A selected row scrolled out of the window stays selected
+        first = view.rows[0][0]
+        view.select(view.iid_by_record[id(first)])
+        view.on_scrollbar('moveto', 0.5)
+        self.assertNotIn(id(first), view.iid_by_record)
+        self.assertEqual(view.selected_records(), {id(first)})
+        view.on_scrollbar('moveto', 0)
+        self.assertEqual(self.app.tree.selection(), (view.iid_by_record[id(first)],))
+        
+        # Down on the last row of the window moves the window on by one
+        children = self.app.tree.get_children()
+        self.app.tree.focus(children[-1])
+        self.assertEqual(view.on_key(SimpleNamespace(keysym='Down', state=0)), 'break')
+        self.assertEqual(view.first, 1)
+        self.assertIs(view.record_by_iid[self.app.tree.focus()], view.rows[len(children)][0])
+        self.assertEqual(view.selected_records(), {id(view.rows[len(children)][0])})
+
+    def test_inventory_index(self):
+        """Test name and duplicate lookups follow renames, removals and inventory replacement."""
+        self.app.inventory = [self.test_cigar]
+        self.assertIs(self.app.find_cigar('Test Cigar'), self.test_cigar)
+
+        # Renaming moves the index entry and the checkbox state
+        self.app.checkbox_states = {'Test Cigar': True}
+        self.app.rename_cigar(self.test_cigar, 'Renamed Cigar')
+        self.assertIs(self.app.find_cigar('Renamed Cigar'), self.test_cigar)
+        self.assertIsNone(self.app.find_cigar('Test Cigar'))
+        self.assertTrue(self.app.checkbox_states.get('Renamed Cigar'))
+        # The duplicate check's (brand, cigar, size) groups follow the rename too
+        self.assertIs(self.app.check_for_duplicate_cigar('test brand', 'renamed cigar', 'robusto'), self.test_cigar)
+        self.assertIsNone(self.app.check_for_duplicate_cigar('Test Brand', 'Test Cigar', 'Robusto'))
+
+        # Another record sharing the renamed-away name is still found
+        other = dict(self.test_cigar, brand='Other Brand', cigar='Shared Cigar')
+        self.app.inventory.append(other)
+        self.app.rename_cigar(self.test_cigar, 'Shared Cigar')
+        self.app.rename_cigar(self.test_cigar, 'Renamed Cigar')
+        self.assertIs(self.app.find_cigar('Shared Cigar'), other)
+
+        # Deleting a cigar and then adding one leaves no trace of the deleted record
+        self.assertIs(self.app.check_for_duplicate_cigar('Other Brand', 'Shared Cigar', 'Robusto'), other)
+        self.app.refresh_inventory()
+        self.app.inventory_view.select(self.app.inventory_view.iid_by_record[id(other)])
+        with mock.patch('main.messagebox.askyesno', return_value=True), mock.patch('main.messagebox.showinfo'):
+            self.app.remove_selected()
+        self.app.add_new_line()
+        added = self.app.inventory[-1]
+        self.assertEqual(len(self.app.inventory), 2)
+        self.assertIsNone(self.app.check_for_duplicate_cigar('Other Brand', 'Shared Cigar', 'Robusto'))
+        self.assertIs(self.app.check_for_duplicate_cigar('', added['cigar'], ''), added)
+
+        # Replacing the inventory list is picked up without a manual rebuild
+        self.app.inventory = []
+        self.assertIsNone(self.app.find_cigar('Renamed Cigar'))
+
+    def _history_logs(self):
+        """(history attribute, save, load, log filename, sample record) for each appended record log."""
+        record = {'date': '2024-01-01 12:00:00', 'brand': 'Test Brand', 'cigar': 'Test Cigar',
+                  'size': 'Robusto', 'quantity': 3, 'total_cost': 30.0}
+        return [
+            ('sales_history', self.app.save_sales_history, self.app.load_sales_history,
+             'sales_history.jsonl', dict(record, price_per_stick=10.0)),
+            ('resupply_history', self.app.save_resupply_history, self.app.load_resupply_history,
+             'resupply_history.jsonl', dict(record, order_id='order-1', type='Regular', price=25.0,
+                                            shipping_tax=5.0)),
+        ]
+
+    def test_record_log_replay(self):
+        """Test that appended sales and resupply log changes replay to the same history."""
+        for name, save, load, _, record in self._history_logs():
+            with self.subTest(history=name):
+                other = dict(record, cigar='Other Cigar')
+                setattr(self.app, name, [record, other])
+                save()
+
+                # A partial return and an undo are appended rather than rewriting the file
+                record['quantity'] = 1
+                record['total_cost'] = 10.0
+                getattr(self.app, name).remove(other)
+                save()
+
+                load()
+                history = getattr(self.app, name)
+                self.assertEqual(len(history), 1)
+                self.assertEqual(history[0]['cigar'], 'Test Cigar')
+                self.assertEqual(history[0]['quantity'], 1)
+                self.assertEqual(history[0]['total_cost'], 10.0)
+
+    def test_record_log_torn_line(self):
+        """Test that a record saved after a torn last log line survives a reload."""
+        for name, save, load, filename, record in self._history_logs():
+            with self.subTest(history=name):
+                setattr(self.app, name, [dict(record, cigar=f'Cigar {i:02d}') for i in range(20)])
+                save()
+                self.assertTrue(self.app.wait_for_writes())
+
+                # A crash mid-append leaves the last line cut off with no newline
+                path = os.path.join(self.test_dir, filename)
+                with open(path, 'rb+') as f:
+                    f.truncate(os.path.getsize(path) - 20)
+
+                load()
+                self.assertEqual(len(getattr(self.app, name)), 19)
+                getattr(self.app, name).append(dict(record, cigar='New Cigar'))
+                save()
+
+                load()
+                history = getattr(self.app, name)
+                self.assertEqual(len(history), 20)
+                self.assertEqual(history[-1]['cigar'], 'New Cigar')
+
+    def test_resupply_history_migration(self):
+        """Test that a legacy resupply_history.json loads unchanged and is rewritten as a log."""
+        legacy = [
+            {'order_id': 'order-1', 'date': '2024-01-01 12:00:00', 'brand': 'Test Brand',
+             'cigar': 'Test Cigar', 'size': 'Robusto', 'quantity': 5, 'total_cost': 55.0},
+            {'order_id': 'order-2', 'date': '2024-02-01 12:00:00', 'brand': 'Test Brand',
+             'cigar': 'Other Cigar', 'size': 'Toro', 'quantity': 3, 'total_cost': 30.0}
+        ]
+        with open(os.path.join(self.test_dir, 'resupply_history.json'), 'w') as f:
+            json.dump(legacy, f)
+
+        self.app.load_resupply_history()
+        self.assertEqual([{key: value for key, value in record.items() if key != 'resupply_id'}
+                          for record in self.app.resupply_history], legacy)
+        self.assertTrue(all(record.get('resupply_id') for record in self.app.resupply_history))
+
+        # The migrated records are written out as a compacted log, one line per record
+        self.assertTrue(self.app.wait_for_writes())
+        with open(os.path.join(self.test_dir, 'resupply_history.jsonl')) as f:
+            logged = [json.loads(line) for line in f if line.strip()]
+        self.assertEqual(logged, self.app.resupply_history)
+
+        # The log now takes over from the legacy file
+        self.app.load_resupply_history()
+        self.assertEqual(self.app.resupply_history, logged)
+
+    def test_failed_background_write(self):
+        """Test that a failed background write is reported and forgotten, so the next save retries it."""
+        sale = {'date': '2024-01-01 12:00:00', 'brand': 'Test Brand', 'cigar': 'Test Cigar',
+                'size': 'Robusto', 'price_per_stick': 10.0, 'quantity': 3, 'total_cost': 30.0}
+        self.app.inventory = [self.test_cigar]
+        self.app.sales_history = [sale]
+        
+        # Writes into a directory that does not exist fail on the writer thread
+        self.app.data_directory = os.path.join(self.test_dir, 'missing')
+        with mock.patch('main.messagebox.showerror') as showerror:
+            self.app.save_inventory()
+            self.app.save_sales_history()
+            self.assertFalse(self.app.wait_for_writes())
+        self.assertEqual(showerror.call_count, 2)
+        self.assertNotIn(self.app.get_data_file_path('cigar_inventory.json'), self.app._written_files)
+        self.assertNotIn('sales_history.jsonl', self.app._record_logs)
+        
+        # Nothing is left queued once the failures are reported
+        self.assertTrue(self.app.wait_for_writes())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file